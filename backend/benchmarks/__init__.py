@@ -0,0 +1 @@
+"""Offline benchmarks for CPU-bound HireVision services."""
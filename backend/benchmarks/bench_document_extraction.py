@@ -0,0 +1,111 @@
+"""
+Benchmark resume text extraction per document format.
+
+Builds synthetic PDF, DOCX and RTF resumes of the same length in memory
+and reports documents and megabytes per second for each format through
+extract_document_text, both uncapped and with the RESUME_TEXT_MAX_TOKENS
+budget.
+
+Run from backend/ (the usual .env must be present for the services package):
+    python -m benchmarks.bench_document_extraction [--resumes 50] [--pages 1 4 40]
+"""
+import argparse
+import io
+import random
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+from core.config import settings
+from core.process_pool import document_pool
+from services.document_extraction import extract_document_text, sniff_format
+from .bench_pdf_extraction import SECTIONS, WORDS, synthetic_resume
+
+LINES_PER_PAGE = 48
+
+
+def _lines(pages: int, seed: int) -> list:
+    rng = random.Random(seed)
+    lines = []
+    for page in range(pages):
+        lines.append(f"Candidate {seed} - {SECTIONS[page % len(SECTIONS)]}")
+        for _ in range(LINES_PER_PAGE):
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))).capitalize() + ".")
+    return lines
+
+
+def synthetic_docx(pages: int, seed: int = 0) -> bytes:
+    """Build a minimal DOCX resume with about as much text as the PDF of the same page count."""
+    body = "".join(
+        f'<w:p><w:r><w:t xml:space="preserve">{escape(line)}</w:t></w:r></w:p>'
+        for line in _lines(pages, seed)
+    )
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{body}</w:body></w:document>"
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Override PartName="/word/document.xml" ContentType="application/'
+            'vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/></Types>'
+        )
+        archive.writestr("word/document.xml", document)
+    return out.getvalue()
+
+
+def synthetic_rtf(pages: int, seed: int = 0) -> bytes:
+    """Build an RTF resume with a font and color table and the same text as the other formats."""
+    body = "".join(f"{{\\b0 {line}}}\\par\n" for line in _lines(pages, seed))
+    return (
+        "{\\rtf1\\ansi\\deff0{\\fonttbl{\\f0 Helvetica;}}{\\colortbl;\\red0\\green0\\blue0;}"
+        "{\\*\\generator bench;}\\f0\\fs20\n" + body + "}"
+    ).encode()
+
+
+def run(name: str, corpus: list, max_tokens: int) -> dict:
+    size = sum(len(data) for data in corpus)
+    start = time.perf_counter()
+    chars = sum(len(extract_document_text(data, max_tokens=max_tokens)) for data in corpus)
+    wall = time.perf_counter() - start
+    return {
+        "format": name,
+        "docs_per_second": len(corpus) / wall,
+        "mb_per_second": size / wall / 1024 / 1024,
+        "avg_chars": chars / len(corpus),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=50, help="documents per format and page count")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 4, 40])
+    args = parser.parse_args()
+
+    builders = {"pdf": synthetic_resume, "docx": synthetic_docx, "rtf": synthetic_rtf}
+    for name, build in builders.items():
+        assert sniff_format(build(1)) == name
+
+    # Start the pool workers before timing
+    extract_document_text(synthetic_resume(2), max_tokens=0)
+
+    print(f"token budget: {settings.resume_text_max_tokens}")
+    print(f"{'pages/doc':>9} {'format':>6} {'budget':>7} {'docs/s':>9} {'MB/s':>8} {'avg_chars':>10}")
+    for count in args.pages:
+        for name, build in builders.items():
+            corpus = [build(count, seed) for seed in range(args.resumes)]
+            for max_tokens in (0, settings.resume_text_max_tokens):
+                r = run(name, corpus, max_tokens)
+                print(
+                    f"{count:>9} {r['format']:>6} {max_tokens or 'none':>7} {r['docs_per_second']:>9.1f} "
+                    f"{r['mb_per_second']:>8.2f} {r['avg_chars']:>10.0f}"
+                )
+    document_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Benchmark PDF text extraction on synthetic resumes.
+
+Builds a corpus of text PDFs of 1 to 40 pages in memory and reports pages
+per second for pypdfium2 (serial and page-parallel through the document
+pool) and for pdfplumber, plus the peak RSS of the benchmark process.
+
+Run from backend/ (the usual .env must be present for the services package):
+    python -m benchmarks.bench_pdf_extraction [--resumes 50] [--pages 1 2 4 40]
+"""
+import argparse
+import random
+import resource
+import time
+
+from core.process_pool import document_pool
+from services.pdf_extraction import _pdfplumber_text, extract_pdf_text
+
+WORDS = (
+    "led designed built migrated scaled python kubernetes postgres kafka react "
+    "team latency revenue customers pipeline platform api service reduced improved "
+    "launched mentored architecture analytics billing search payments infrastructure"
+).split()
+SECTIONS = ["Experience", "Projects", "Education", "Skills", "Publications"]
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def synthetic_resume(pages: int, seed: int = 0) -> bytes:
+    """Build a text-only PDF resume of the given number of pages."""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in range(pages):
+        lines = [f"Candidate {seed} - {SECTIONS[page % len(SECTIONS)]}"]
+        for _ in range(48):
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 14))).capitalize() + ".")
+        stream = "BT /F1 10 Tf 12 TL 50 760 Td " + " ".join(f"({_escape(line)}) '" for line in lines) + " ET"
+        content = stream.encode()
+        objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run(name: str, extract, corpus: list) -> dict:
+    pages = sum(count for count, _ in corpus)
+    start = time.perf_counter()
+    for _, data in corpus:
+        extract(data)
+    wall = time.perf_counter() - start
+    return {"engine": name, "pages": pages, "wall_seconds": wall, "pages_per_second": pages / wall}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--resumes", type=int, default=50, help="documents per page count")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 4, 40])
+    args = parser.parse_args()
+
+    # Start the pool workers before timing
+    extract_pdf_text(synthetic_resume(2), parallel_min_pages=1)
+
+    print(f"document pool workers: {document_pool.workers}")
+    print(f"{'pages/doc':>9} {'engine':>16} {'pages':>6} {'wall_s':>8} {'pages/s':>9} {'peak_rss_mb':>11}")
+    for count in args.pages:
+        corpus = [(count, synthetic_resume(count, seed)) for seed in range(args.resumes)]
+        engines = [
+            ("pypdfium2", lambda data: extract_pdf_text(data, parallel_min_pages=10 ** 9)),
+            ("pypdfium2-pool", lambda data: extract_pdf_text(data, parallel_min_pages=1)),
+            ("pdfplumber", _pdfplumber_text),
+        ]
+        for name, extract in engines:
+            r = run(name, extract, corpus)
+            print(
+                f"{count:>9} {r['engine']:>16} {r['pages']:>6} {r['wall_seconds']:>8.2f} "
+                f"{r['pages_per_second']:>9.1f} {_peak_rss_mb():>11.1f}"
+            )
+    document_pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
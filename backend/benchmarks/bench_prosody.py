@@ -0,0 +1,84 @@
+"""
+Benchmark the prosody engine on synthetic speech.
+
+Reports throughput in audio-seconds per CPU-second for 1 to 60 minute
+recordings. Audio is synthesized and fed in 1-second chunks, the same way
+stream_audio_from_video delivers it, so the full waveform is never held in
+memory.
+
+Run from backend/ (the usual .env must be present for the services package):
+    python -m benchmarks.bench_prosody [--minutes 1 5 15 30 60]
+"""
+import argparse
+import time
+from typing import Iterator
+import numpy as np
+
+from services.prosody import analyze_prosody
+
+SR = 16000
+
+
+def synthetic_speech(minutes: float, sr: int = SR, seed: int = 0) -> Iterator[np.ndarray]:
+    """Yield 1-second chunks of a harmonic voice with syllable rhythm, pitch drift and pauses."""
+    rng = np.random.default_rng(seed)
+    phase = 0.0
+    for second in range(int(minutes * 60)):
+        t = second + np.arange(sr) / sr
+        f0 = 140 + 30 * np.sin(2 * np.pi * 0.2 * t)
+        phases = phase + 2 * np.pi * np.cumsum(f0) / sr
+        phase = phases[-1]
+        voice = sum(np.sin(k * phases) / k for k in range(1, 6))
+        syllables = (0.5 + 0.5 * np.sin(2 * np.pi * 4 * t)) ** 2
+        talking = (t % 6) < 4.8
+        noise = 0.002 * rng.standard_normal(sr)
+        yield (0.3 * voice * syllables * talking + noise).astype(np.float32)
+
+
+def run(minutes: float) -> dict:
+    start_cpu = time.process_time()
+    start_wall = time.perf_counter()
+    result = analyze_prosody(synthetic_speech(minutes), sr=SR)
+    cpu = time.process_time() - start_cpu
+    wall = time.perf_counter() - start_wall
+    return {
+        "minutes": minutes,
+        "cpu_seconds": cpu,
+        "wall_seconds": wall,
+        "audio_s_per_cpu_s": minutes * 60 / cpu if cpu else float("inf"),
+        "mean_pitch_hz": result["pitch"]["mean_hz"],
+        "pauses": result["pauses"]["count"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 5, 15, 30, 60])
+    args = parser.parse_args()
+
+    # Compile the numba kernels before timing
+    analyze_prosody(synthetic_speech(0.05), sr=SR)
+
+    # Synthesis runs inside the timed loop; measure it so it can be subtracted
+    start = time.process_time()
+    for _ in synthetic_speech(1):
+        pass
+    synth_per_minute = time.process_time() - start
+
+    print(f"synthesis: {synth_per_minute:.2f} CPU-s per audio minute")
+    print(
+        f"{'minutes':>8} {'cpu_s':>8} {'wall_s':>8} {'audio_s/cpu_s':>14} "
+        f"{'engine_only':>12} {'pitch_hz':>9} {'pauses':>7}"
+    )
+    for minutes in args.minutes:
+        r = run(minutes)
+        engine_cpu = max(r["cpu_seconds"] - synth_per_minute * minutes, 1e-9)
+        print(
+            f"{r['minutes']:>8g} {r['cpu_seconds']:>8.2f} {r['wall_seconds']:>8.2f} "
+            f"{r['audio_s_per_cpu_s']:>14.1f} {minutes * 60 / engine_cpu:>12.1f} "
+            f"{r['mean_pitch_hz']:>9.1f} {r['pauses']:>7}"
+        )
+
+
+if __name__ == "__main__":
+    main()
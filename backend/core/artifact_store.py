@@ -0,0 +1,170 @@
+"""Content-addressed, compressed, size-capped artifact store on local disk."""
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from .config import settings
+
+CODEC_EXTENSIONS = {"zstd": ".zst", "gzip": ".gz", "none": ""}
+# Stored artifacts are named by their key; anything else (e.g. temp files left by an interrupted write) isn't
+ARTIFACT_NAME = re.compile(r"^[0-9a-f]{64}(?:\.zst|\.gz)?$")
+
+
+def _resolve_codec(codec: str) -> str:
+    if codec == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    if codec == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the zstandard package")
+    if codec not in CODEC_EXTENSIONS:
+        raise ValueError(f"Unknown compression codec '{codec}'")
+    return codec
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6)
+    return data
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    return data
+
+
+class ArtifactStore:
+    """
+    Store blobs (summaries, transcripts, raw LLM outputs) under their SHA-256.
+
+    Artifacts live at <root>/<kind>/<key[:2]>/<key><ext>, so a lookup is a
+    single path computation. An in-memory LRU index of file sizes, built from
+    one directory scan at startup, keeps total disk usage under max_bytes by
+    evicting the least recently used artifacts. Each process keeps its own
+    index, so with several workers the cap is enforced approximately.
+    """
+
+    def __init__(self, root: str, max_bytes: int, codec: str = "auto"):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.codec = _resolve_codec(codec)
+        self._lock = threading.Lock()
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._total = 0
+        os.makedirs(root, exist_ok=True)
+        self._scan()
+
+    @staticmethod
+    def key_for(data: Union[bytes, str]) -> str:
+        """Return the content key (hex SHA-256) of data."""
+        if isinstance(data, str):
+            data = data.encode()
+        return hashlib.sha256(data).hexdigest()
+
+    def put(self, kind: str, data: Union[bytes, str]) -> str:
+        """
+        Store data and return its content key.
+
+        Storing the same content again is a no-op apart from refreshing its
+        position in the eviction order.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+        key = self.key_for(data)
+        path = self._path(kind, key, self.codec)
+
+        with self._lock:
+            if path in self._index:
+                self._index.move_to_end(path)
+                return key
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compressed = _compress(data, self.codec)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            # A concurrent put of the same content may have indexed it already
+            if path in self._index:
+                self._index.move_to_end(path)
+                return key
+            self._index[path] = len(compressed)
+            self._total += len(compressed)
+            self._evict()
+        return key
+
+    def get(self, kind: str, key: str) -> Optional[bytes]:
+        """Return the artifact's bytes, or None if it is not stored."""
+        for codec in (self.codec, *(c for c in CODEC_EXTENSIONS if c != self.codec)):
+            path = self._path(kind, key, codec)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            with self._lock:
+                if path in self._index:
+                    self._index.move_to_end(path)
+            return _decompress(data, codec)
+        return None
+
+    def get_text(self, kind: str, key: str) -> Optional[str]:
+        """Return the artifact decoded as UTF-8 text, or None if it is not stored."""
+        data = self.get(kind, key)
+        return data.decode() if data is not None else None
+
+    def usage(self) -> dict:
+        """Return the number of artifacts and bytes on disk tracked by this process."""
+        with self._lock:
+            return {"artifacts": len(self._index), "bytes": self._total, "max_bytes": self.max_bytes}
+
+    def _path(self, kind: str, key: str, codec: str) -> str:
+        return os.path.join(self.root, kind, key[:2], key + CODEC_EXTENSIONS[codec])
+
+    def _scan(self) -> None:
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if not ARTIFACT_NAME.match(name):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, path, stat.st_size))
+        for _, path, size in sorted(entries):
+            self._index[path] = size
+            self._total += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._index:
+            path, size = self._index.popitem(last=False)
+            self._total -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+artifact_store = ArtifactStore(
+    settings.artifact_store_path,
+    max_bytes=settings.artifact_store_max_mb * 1024 * 1024,
+    codec=settings.artifact_compression,
+)
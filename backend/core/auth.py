@@ -1,19 +1,52 @@
 """Authentication helpers for HireVision backend."""
+import hashlib
+import jwt
 import requests
 from fastapi import Request, HTTPException
+
+from .cache import TTLCache
 from .config import settings
 
+# Algorithms we can verify with the shared Supabase JWT secret
+LOCAL_JWT_ALGORITHMS = ["HS256"]
 
-def get_current_user_id(req: Request) -> str:
-    """
-    Resolve current user id (UUID) via Supabase Auth /auth/v1/user.
-    Requires Authorization: Bearer <access_token> header from the client.
-    """
-    auth = req.headers.get("authorization", "")
-    if not auth.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Missing Bearer token")
-    token = auth.split(" ", 1)[1]
+# Verified claims keyed by SHA-256 of the token; entries expire with the token
+_verified_tokens = TTLCache(maxsize=settings.auth_token_cache_size)
 
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _can_verify_locally(token: str) -> bool:
+    """Return True if the token is signed with an algorithm our JWT secret covers."""
+    if not settings.supabase_jwt_secret:
+        return False
+    try:
+        header = jwt.get_unverified_header(token)
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    return header.get("alg") in LOCAL_JWT_ALGORITHMS
+
+
+def _verify_locally(token: str) -> dict:
+    """Verify signature, expiry and audience of a Supabase access token."""
+    try:
+        return jwt.decode(
+            token,
+            settings.supabase_jwt_secret,
+            algorithms=LOCAL_JWT_ALGORITHMS,
+            audience=settings.supabase_jwt_audience,
+            options={"require": ["exp", "sub"]},
+        )
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+def _verify_remotely(token: str) -> dict:
+    """Resolve the token via Supabase Auth /auth/v1/user and return its claims."""
     try:
         resp = requests.get(
             f"{settings.supabase_url}/auth/v1/user",
@@ -30,8 +63,43 @@ def get_current_user_id(req: Request) -> str:
         raise HTTPException(status_code=401, detail="Invalid token")
 
     try:
-        user_json = resp.json()
-        return user_json["id"]
+        user_id = resp.json()["id"]
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid auth response")
 
+    # Supabase vouched for the token, so its unverified expiry is safe to cache on
+    try:
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except jwt.InvalidTokenError:
+        claims = {}
+    return {"sub": user_id, "exp": claims.get("exp", 0)}
+
+
+def get_current_user_id(req: Request) -> str:
+    """
+    Resolve current user id (UUID) from the Supabase access token.
+    Requires Authorization: Bearer <access_token> header from the client.
+    
+    Tokens are verified locally against SUPABASE_JWT_SECRET and the claims are
+    cached until the token expires. Supabase Auth /auth/v1/user is only called
+    when local verification isn't possible and AUTH_REMOTE_FALLBACK is enabled.
+    """
+    auth = req.headers.get("authorization", "")
+    if not auth.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Missing Bearer token")
+    token = auth.split(" ", 1)[1]
+
+    key = _token_key(token)
+    claims = _verified_tokens.get(key)
+    if claims is not None:
+        return claims["sub"]
+
+    if _can_verify_locally(token):
+        claims = _verify_locally(token)
+    elif settings.auth_remote_fallback:
+        claims = _verify_remotely(token)
+    else:
+        raise HTTPException(status_code=401, detail="Unable to verify token")
+
+    _verified_tokens.set(key, claims, expires_at=claims.get("exp", 0))
+    return claims["sub"]
@@ -0,0 +1,202 @@
+"""Caching helpers for HireVision backend."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire at a per-entry deadline."""
+
+    def __init__(self, maxsize: int = 1024, default_ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.default_ttl = default_ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """
+        Store value under key.
+        
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Seconds until the entry expires (defaults to default_ttl)
+            expires_at: Absolute unix timestamp at which the entry expires;
+                takes precedence over ttl
+        """
+        if expires_at is None:
+            ttl = ttl if ttl is not None else self.default_ttl
+            expires_at = time.time() + ttl if ttl is not None else float("inf")
+        if expires_at <= time.time():
+            return
+
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """
+    Persistent key/value cache in a local SQLite file.
+    
+    Entries expire after a TTL, and once the stored values exceed max_bytes the
+    least recently used entries are evicted. Several worker processes can
+    share one cache file.
+    """
+
+    def __init__(self, path: str, default_ttl: Optional[float] = None, max_bytes: Optional[int] = None):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing or expired."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return default
+            if row[1] <= now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return default
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ) -> None:
+        """Store a JSON-serializable value under key; see TTLCache.set."""
+        now = time.time()
+        if expires_at is None:
+            ttl = ttl if ttl is not None else self.default_ttl
+            expires_at = now + ttl if ttl is not None else float("inf")
+        if expires_at <= now:
+            return
+
+        data = json.dumps(value)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, len(data), expires_at, now),
+            )
+            self._evict(now)
+
+    def delete(self, key: str) -> None:
+        """Remove key from the cache if present."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        if self.max_bytes is None:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM cache ORDER BY accessed_at"
+        ).fetchall():
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+def make_cache(
+    backend: str,
+    path: str = "",
+    default_ttl: Optional[float] = None,
+    max_entries: int = 1024,
+    max_bytes: Optional[int] = None,
+):
+    """
+    Build a cache for the configured backend.
+    
+    Args:
+        backend: "memory" for a per-process TTLCache, "sqlite" for a SQLiteCache
+            shared through a local file, or "none" to disable caching
+        path: SQLite file path (sqlite backend only)
+        default_ttl: Seconds entries live by default
+        max_entries: Entry limit (memory backend only)
+        max_bytes: Size limit (sqlite backend only)
+        
+    Returns:
+        A cache object, or None if caching is disabled
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return TTLCache(maxsize=max_entries, default_ttl=default_ttl)
+    if backend == "sqlite":
+        return SQLiteCache(path, default_ttl=default_ttl, max_bytes=max_bytes)
+    raise ValueError(f"Unknown cache backend '{backend}'")
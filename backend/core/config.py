@@ -19,6 +19,120 @@ class Settings(BaseModel):
     supabase_service_key: str = os.getenv("SUPABASE_SERVICE_KEY", "")
     supabase_jwt_secret: str = os.getenv("SUPABASE_JWT_SECRET", "")
     
+    # Auth
+    supabase_jwt_audience: str = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+    auth_remote_fallback: bool = os.getenv("AUTH_REMOTE_FALLBACK", "true").lower() == "true"
+    auth_token_cache_size: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
+    
+    # LLM gateway
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    # Per-route limits, e.g. "chat=4,questions=8"; unlisted routes share the global limit
+    llm_route_concurrency: str = os.getenv("LLM_ROUTE_CONCURRENCY", "")
+    llm_max_retries: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    llm_timeout_seconds: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+    
+    # Video analysis
+    analysis_stage_timeout_seconds: float = float(os.getenv("ANALYSIS_STAGE_TIMEOUT_SECONDS", "45"))
+    # "separate" runs one LLM call per stage, "bundle" tries a single structured call first
+    analysis_mode: str = os.getenv("ANALYSIS_MODE", "separate")
+    batch_analysis_concurrency: int = int(os.getenv("BATCH_ANALYSIS_CONCURRENCY", "4"))
+    
+    # Audio analysis (runs in a process pool alongside transcription)
+    audio_analysis_enabled: bool = os.getenv("AUDIO_ANALYSIS_ENABLED", "true").lower() == "true"
+    audio_analysis_timeout_seconds: float = float(os.getenv("AUDIO_ANALYSIS_TIMEOUT_SECONDS", "300"))
+    audio_pool_workers: int = int(os.getenv("AUDIO_POOL_WORKERS", "2"))
+    # Address-space limit of each pool worker process; a worker runs one task at a time
+    audio_task_memory_mb: int = int(os.getenv("AUDIO_TASK_MEMORY_MB", "2048"))
+    audio_pool_max_tasks_per_child: int = int(os.getenv("AUDIO_POOL_MAX_TASKS_PER_CHILD", "50"))
+    
+    # Emotion recognition (FER+ ONNX model from the ONNX model zoo). The weights aren't shipped:
+    # fetch them with `python -m dev.fetch_emotion_model` before enabling
+    emotion_analysis_enabled: bool = os.getenv("EMOTION_ANALYSIS_ENABLED", "false").lower() == "true"
+    emotion_sample_seconds: float = float(os.getenv("EMOTION_SAMPLE_SECONDS", "1"))
+    emotion_analysis_timeout_seconds: float = float(os.getenv("EMOTION_ANALYSIS_TIMEOUT_SECONDS", "300"))
+    emotion_model_path: str = os.getenv("EMOTION_MODEL_PATH", "data/models/emotion-ferplus-8.onnx")
+    emotion_batch_size: int = int(os.getenv("EMOTION_BATCH_SIZE", "32"))
+    # Long videos are split into segments of this length and analyzed in parallel
+    emotion_segment_seconds: float = float(os.getenv("EMOTION_SEGMENT_SECONDS", "60"))
+    emotion_pool_workers: int = int(os.getenv("EMOTION_POOL_WORKERS", str(os.cpu_count() or 1)))
+    # Per worker process, like AUDIO_TASK_MEMORY_MB
+    emotion_task_memory_mb: int = int(os.getenv("EMOTION_TASK_MEMORY_MB", "2048"))
+    
+    # Resume experience extraction (spaCy model used to tell company names from job titles)
+    resume_spacy_model: str = os.getenv("RESUME_SPACY_MODEL", "en_core_web_sm")
+    
+    # Batch resume question generation (downloads and LLM calls vs. parsing)
+    resume_batch_io_concurrency: int = int(os.getenv("RESUME_BATCH_IO_CONCURRENCY", "8"))
+    resume_batch_cpu_concurrency: int = int(os.getenv("RESUME_BATCH_CPU_CONCURRENCY", "2"))
+    
+    # Document extraction (PDFs with at least this many pages are split across the pool)
+    pdf_parallel_min_pages: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "8"))
+    document_pool_workers: int = int(os.getenv("DOCUMENT_POOL_WORKERS", str(os.cpu_count() or 1)))
+    # Per worker process, like AUDIO_TASK_MEMORY_MB
+    document_task_memory_mb: int = int(os.getenv("DOCUMENT_TASK_MEMORY_MB", "1024"))
+    # Extracted resume text is capped at about this many tokens (0 for no cap)
+    resume_text_max_tokens: int = int(os.getenv("RESUME_TEXT_MAX_TOKENS", "8000"))
+    
+    # Media ingestion (each video is downloaded once and demuxed for all analyzers)
+    media_ingestion_enabled: bool = os.getenv("MEDIA_INGESTION_ENABLED", "true").lower() == "true"
+    # Directory for per-video temp data; empty uses the system temp directory
+    media_ingest_dir: str = os.getenv("MEDIA_INGEST_DIR", "")
+    media_ingest_max_mb: int = int(os.getenv("MEDIA_INGEST_MAX_MB", "500"))
+    media_ingest_timeout_seconds: float = float(os.getenv("MEDIA_INGEST_TIMEOUT_SECONDS", "300"))
+    
+    # Transcription
+    # "opus" uploads compact 16 kHz mono Opus audio extracted with ffmpeg, "video" lets AssemblyAI fetch the video URL
+    transcription_audio_mode: str = os.getenv("TRANSCRIPTION_AUDIO_MODE", "opus")
+    transcription_opus_bitrate: str = os.getenv("TRANSCRIPTION_OPUS_BITRATE", "24k")
+    # In opus mode, trim silence and transcribe segments split at pauses concurrently
+    transcription_chunking_enabled: bool = os.getenv("TRANSCRIPTION_CHUNKING_ENABLED", "true").lower() == "true"
+    transcription_chunk_seconds: float = float(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "60"))
+    transcription_chunk_concurrency: int = int(os.getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", "4"))
+    # Extra attempts for a failed segment before falling back to one whole-audio job
+    transcription_segment_retries: int = int(os.getenv("TRANSCRIPTION_SEGMENT_RETRIES", "1"))
+    assemblyai_base_url: str = os.getenv("ASSEMBLYAI_BASE_URL", "https://api.assemblyai.com")
+    # Public URL of POST /api/api/webhooks/assemblyai (main.py mounts every router
+    # under /api on top of its own /api prefix); leave empty to rely on polling
+    assemblyai_webhook_url: str = os.getenv("ASSEMBLYAI_WEBHOOK_URL", "")
+    assemblyai_webhook_secret: str = os.getenv("ASSEMBLYAI_WEBHOOK_SECRET", "")
+    transcription_poll_interval_seconds: float = float(os.getenv("TRANSCRIPTION_POLL_INTERVAL_SECONDS", "2"))
+    transcription_poll_max_interval_seconds: float = float(os.getenv("TRANSCRIPTION_POLL_MAX_INTERVAL_SECONDS", "15"))
+    transcription_webhook_poll_interval_seconds: float = float(os.getenv("TRANSCRIPTION_WEBHOOK_POLL_INTERVAL_SECONDS", "30"))
+    transcription_timeout_seconds: float = float(os.getenv("TRANSCRIPTION_TIMEOUT_SECONDS", "1800"))
+    
+    # Transcript cache: "sqlite" (shared file), "memory" (per process) or "none"
+    transcript_cache_backend: str = os.getenv("TRANSCRIPT_CACHE_BACKEND", "sqlite")
+    transcript_cache_path: str = os.getenv("TRANSCRIPT_CACHE_PATH", "data/transcripts.sqlite3")
+    transcript_cache_ttl_seconds: float = float(os.getenv("TRANSCRIPT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+    transcript_cache_max_mb: int = int(os.getenv("TRANSCRIPT_CACHE_MAX_MB", "256"))
+    
+    # Job description cache: "memory" (per process), "sqlite" (shared by all workers on the host) or "none"
+    job_description_cache_backend: str = os.getenv("JOB_DESCRIPTION_CACHE_BACKEND", "memory")
+    job_description_cache_path: str = os.getenv("JOB_DESCRIPTION_CACHE_PATH", "data/job_descriptions.sqlite3")
+    job_description_cache_ttl_seconds: float = float(os.getenv("JOB_DESCRIPTION_CACHE_TTL_SECONDS", "300"))
+    job_description_cache_size: int = int(os.getenv("JOB_DESCRIPTION_CACHE_SIZE", "1024"))
+    
+    # Resume question cache: "sqlite" (shared file), "memory" (per process) or "none"
+    question_cache_backend: str = os.getenv("QUESTION_CACHE_BACKEND", "sqlite")
+    question_cache_path: str = os.getenv("QUESTION_CACHE_PATH", "data/questions.sqlite3")
+    question_cache_ttl_seconds: float = float(os.getenv("QUESTION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+    question_cache_max_mb: int = int(os.getenv("QUESTION_CACHE_MAX_MB", "64"))
+    
+    # Artifact store (summaries, transcripts, raw LLM outputs)
+    artifact_store_path: str = os.getenv("ARTIFACT_STORE_PATH", "data/artifacts")
+    artifact_store_max_mb: int = int(os.getenv("ARTIFACT_STORE_MAX_MB", "512"))
+    # "auto" uses zstd when the zstandard package is installed, gzip otherwise
+    artifact_compression: str = os.getenv("ARTIFACT_COMPRESSION", "auto")
+    artifact_store_llm_outputs: bool = os.getenv("ARTIFACT_STORE_LLM_OUTPUTS", "false").lower() == "true"
+    
+    # Background jobs
+    job_queue_path: str = os.getenv("JOB_QUEUE_PATH", "data/jobs.sqlite3")
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    job_poll_interval_seconds: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1"))
+    # A running job's worker renews its lease; jobs whose lease runs out are requeued
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    
     # Email
     gmail_user: str = os.getenv("GMAIL_USER", "")
     gmail_app_password: str = os.getenv("GMAIL_APP_PASSWORD", "")
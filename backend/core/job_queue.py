@@ -0,0 +1,274 @@
+"""Persistent background job queue for HireVision backend."""
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Optional
+
+from .config import settings
+
+JobHandler = Callable[[dict], Awaitable[Any]]
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class SQLiteJobQueue:
+    """
+    Job queue stored in a local SQLite file so jobs survive restarts.
+
+    Several worker processes can share the file. A claimed job records its
+    owner and a lease the owner keeps renewing while it runs; only jobs
+    whose lease ran out are taken back.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, lease_seconds: float = 60.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                lease_expires REAL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        # Queue files created before leases existed
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_expires", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    def enqueue(self, kind: str, payload: dict) -> str:
+        """Add a job and return its id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(payload), QUEUED, now, now),
+            )
+        return job_id
+
+    def claim(self) -> Optional[dict]:
+        """Mark the oldest queued job as running and return it, or None if the queue is empty."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, owner = ?, lease_expires = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (RUNNING, self.owner, now + self.lease_seconds, now, row["id"]),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self._row_to_job(row, status=RUNNING, attempts=row["attempts"] + 1, owner=self.owner)
+
+    def complete(self, job_id: str, result: Any) -> None:
+        """Store the result of a finished job."""
+        self._finish(job_id, COMPLETED, result=json.dumps(result))
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job as failed with an error message."""
+        self._finish(job_id, FAILED, error=error)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Return a job by id, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def renew(self, job_id: str) -> None:
+        """Extend the lease of a job this process is running."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND owner = ?",
+                (now + self.lease_seconds, now, job_id, RUNNING, self.owner),
+            )
+
+    def recover(self) -> int:
+        """
+        Requeue running jobs whose owner stopped renewing their lease.
+
+        Jobs that already used up max_attempts are marked failed instead.
+        Jobs a live process is still running keep their lease and are left
+        alone, so this is safe to call from every process sharing the file.
+
+        Returns:
+            Number of jobs put back on the queue
+        """
+        now = time.time()
+        expired = "status = ? AND (lease_expires IS NULL OR lease_expires < ?)"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    f"UPDATE jobs SET status = ?, error = ?, owner = NULL, updated_at = ? "
+                    f"WHERE {expired} AND attempts >= ?",
+                    (FAILED, "Interrupted too many times", now, RUNNING, now, self.max_attempts),
+                )
+                cursor = self._conn.execute(
+                    f"UPDATE jobs SET status = ?, owner = NULL, lease_expires = NULL, updated_at = ? WHERE {expired}",
+                    (QUEUED, now, RUNNING, now),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return cursor.rowcount
+
+    def _finish(self, job_id: str, status: str, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, result, error, time.time(), job_id),
+            )
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row, **overrides) -> dict:
+        job = {
+            "id": row["id"],
+            "kind": row["kind"],
+            "payload": json.loads(row["payload"]),
+            "status": row["status"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "owner": row["owner"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+        job.update(overrides)
+        return job
+
+
+class JobWorkerPool:
+    """Fixed number of asyncio workers that run queued jobs through registered handlers."""
+
+    def __init__(self, queue: SQLiteJobQueue, workers: int = 2, poll_interval: float = 1.0):
+        self.queue = queue
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._handlers: dict[str, JobHandler] = {}
+        self._tasks: list[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine function that runs jobs of the given kind."""
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: dict) -> str:
+        """Enqueue a job, wake an idle worker and return the job id."""
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job_id = self.queue.enqueue(kind, payload)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    async def start(self) -> None:
+        """Requeue interrupted jobs and start the workers."""
+        self._recover()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs they were running are requeued once their lease expires."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            job = await asyncio.to_thread(self.queue.claim)
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    def _recover(self) -> None:
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"Requeued {recovered} interrupted job(s)")
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    async def _reaper(self) -> None:
+        # Picks up jobs of a sibling process that died while this one keeps running
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds)
+            await asyncio.to_thread(self._recover)
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            await asyncio.to_thread(self.queue.renew, job_id)
+
+    async def _run(self, job: dict) -> None:
+        handler = self._handlers.get(job["kind"])
+        if handler is None:
+            self.queue.fail(job["id"], f"No handler registered for job kind '{job['kind']}'")
+            return
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            result = await handler(job["payload"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Job {job['id']} failed: {str(e)}")
+            self.queue.fail(job["id"], str(e))
+            return
+        finally:
+            heartbeat.cancel()
+        self.queue.complete(job["id"], result)
+
+
+job_pool = JobWorkerPool(
+    SQLiteJobQueue(
+        settings.job_queue_path,
+        max_attempts=settings.job_max_attempts,
+        lease_seconds=settings.job_lease_seconds,
+    ),
+    workers=settings.job_workers,
+    poll_interval=settings.job_poll_interval_seconds,
+)
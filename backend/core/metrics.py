@@ -0,0 +1,46 @@
+"""Lightweight in-process metrics for HireVision backend."""
+import threading
+from collections import defaultdict, deque
+
+
+class Metrics:
+    """Thread-safe counters and bounded timing samples, keyed by dotted names."""
+
+    def __init__(self, max_samples: int = 1024):
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = defaultdict(float)
+        self._samples: dict[str, deque] = defaultdict(lambda: deque(maxlen=max_samples))
+        self._totals: dict[str, list[float]] = defaultdict(lambda: [0, 0.0])
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add value to the counter called name."""
+        with self._lock:
+            self._counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        """Record one sample (e.g. a latency in seconds) for name."""
+        with self._lock:
+            self._samples[name].append(value)
+            totals = self._totals[name]
+            totals[0] += 1
+            totals[1] += value
+
+    def snapshot(self) -> dict:
+        """Return counters and per-name timing summaries (count, avg, p50, p95, max)."""
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                count, total = self._totals[name]
+                timings[name] = {
+                    "count": count,
+                    "avg": round(total / count, 4) if count else 0.0,
+                    "p50": round(ordered[len(ordered) // 2], 4),
+                    "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+                    "max": round(ordered[-1], 4),
+                }
+        return {"counters": counters, "timings": timings}
+
+
+metrics = Metrics()
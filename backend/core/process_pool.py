@@ -0,0 +1,153 @@
+"""Process pools for CPU-bound work, kept off the event-loop workers."""
+import asyncio
+import multiprocessing
+import resource
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from typing import Any, Callable, Optional
+
+from .config import settings
+
+
+def _limit_memory(memory_mb: int) -> None:
+    """Cap the worker process's address space so its tasks can't starve the host."""
+    if memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+class LazyProcessPool:
+    """
+    ProcessPoolExecutor created on first use.
+
+    Workers are started with the spawn method, recycled after
+    max_tasks_per_child tasks, and each runs one task at a time. memory_mb
+    caps each worker process's address space (0 disables the limit); since
+    a worker runs one task at a time, that is also the most a task can use.
+
+    A task that is still running when its caller gives up (a stage timeout)
+    can't be interrupted inside the worker, so the pool is retired: new work
+    goes to a fresh executor, and the old one's workers are terminated once
+    its other tasks have finished.
+    """
+
+    def __init__(self, name: str, workers: int, memory_mb: int = 0, max_tasks_per_child: Optional[int] = None):
+        self.name = name
+        self.workers = workers
+        self.memory_mb = memory_mb
+        self.max_tasks_per_child = max_tasks_per_child
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Executor -> futures submitted to it that haven't finished
+        self._inflight: dict = {}
+        # Retired executor -> futures whose callers gave up on them
+        self._abandoned: dict = {}
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_limit_memory,
+                    initargs=(self.memory_mb,),
+                    max_tasks_per_child=self.max_tasks_per_child,
+                )
+                self._inflight[self._executor] = set()
+            return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """Submit fn(*args) to the pool; pass the future to retire() if it must be abandoned."""
+        executor = self.executor
+        future = executor.submit(fn, *args)
+        future.executor = executor
+        with self._lock:
+            inflight = self._inflight.setdefault(executor, set())
+            inflight.add(future)
+        future.add_done_callback(lambda done: self._forget(executor, done))
+        return future
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(*args) in the pool without blocking the event loop."""
+        future = self.submit(fn, *args)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            self.retire(future)
+            raise
+
+    def retire(self, *futures: Future) -> None:
+        """
+        Abandon futures whose callers stopped waiting.
+
+        Queued ones are cancelled. If any is already running, its executor
+        takes no new work and its workers are terminated once the executor's
+        other tasks are done.
+        """
+        stuck = {future for future in futures if not future.cancel() and not future.done()}
+        for executor in {future.executor for future in stuck}:
+            with self._lock:
+                draining = executor in self._abandoned
+                self._abandoned.setdefault(executor, set()).update(f for f in stuck if f.executor is executor)
+                if self._executor is executor:
+                    self._executor = None
+            if not draining:
+                print(f"Retiring {self.name} pool workers after an abandoned task")
+                threading.Thread(target=self._drain, args=(executor,), daemon=True).start()
+
+    def _forget(self, executor: ProcessPoolExecutor, future: Future) -> None:
+        with self._lock:
+            self._inflight.get(executor, set()).discard(future)
+
+    def _drain(self, executor: ProcessPoolExecutor) -> None:
+        while True:
+            with self._lock:
+                others = self._inflight.get(executor, set()) - self._abandoned[executor]
+            if not others:
+                break
+            # More of the executor's tasks may be abandoned while we wait
+            wait(others, timeout=1)
+        # There is no public API to stop a busy worker before Python 3.14
+        for process in list((executor._processes or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._inflight.pop(executor, None)
+            self._abandoned.pop(executor, None)
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping tasks that haven't started."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._inflight.pop(self._executor, None)
+                self._executor = None
+
+
+audio_pool = LazyProcessPool(
+    "audio",
+    workers=settings.audio_pool_workers,
+    memory_mb=settings.audio_task_memory_mb,
+    max_tasks_per_child=settings.audio_pool_max_tasks_per_child,
+)
+
+emotion_pool = LazyProcessPool(
+    "emotion",
+    workers=settings.emotion_pool_workers,
+    memory_mb=settings.emotion_task_memory_mb,
+)
+
+document_pool = LazyProcessPool(
+    "document",
+    workers=settings.document_pool_workers,
+    memory_mb=settings.document_task_memory_mb,
+)
+
+pools = [audio_pool, emotion_pool, document_pool]
+
+
+def shutdown_pools() -> None:
+    """Shut down every process pool; called when the app stops."""
+    for pool in pools:
+        pool.shutdown()
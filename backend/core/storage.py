@@ -0,0 +1,64 @@
+"""Signed direct-to-storage uploads."""
+import re
+from typing import Optional
+import requests
+
+from .database import supabase
+
+# Supabase signed upload URLs are valid for two hours
+SIGNED_UPLOAD_TTL_SECONDS = 2 * 60 * 60
+
+
+def safe_object_name(name: str) -> str:
+    """Reduce a client-supplied file name to characters that are safe in a storage key."""
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("._") or "file"
+
+
+def create_signed_upload(bucket: str, path: str) -> dict:
+    """
+    Issue a signed URL the client can upload one object to directly.
+
+    The object bytes then go from the client to storage without passing
+    through the API; only the path comes back to us afterwards.
+
+    Args:
+        bucket: Storage bucket name
+        path: Object path the URL is bound to
+
+    Returns:
+        Dict with upload_url, token, path, public_url and expires_in
+    """
+    storage = supabase.storage.from_(bucket)
+    signed = storage.create_signed_upload_url(path)
+    return {
+        "upload_url": signed["signed_url"],
+        "token": signed["token"],
+        "path": signed["path"],
+        "public_url": storage.get_public_url(path),
+        "expires_in": SIGNED_UPLOAD_TTL_SECONDS,
+    }
+
+
+def object_size(bucket: str, path: str) -> Optional[int]:
+    """
+    Return the size in bytes of a stored object from its metadata, without downloading it.
+
+    The storage object info is used first, then a HEAD request on the
+    public URL. Returns None when the object doesn't exist or neither
+    reports a size.
+    """
+    storage = supabase.storage.from_(bucket)
+    try:
+        info = storage.info(path)
+        size = info.get("size") or (info.get("metadata") or {}).get("size")
+        if size is not None:
+            return int(size)
+    except Exception as e:
+        print(f"Could not read storage object info for {bucket}/{path}: {str(e)}")
+    try:
+        resp = requests.head(storage.get_public_url(path), allow_redirects=True, timeout=5)
+        if resp.status_code == 200 and resp.headers.get("content-length"):
+            return int(resp.headers["content-length"])
+    except (requests.RequestException, ValueError) as e:
+        print(f"Could not check storage object {bucket}/{path}: {str(e)}")
+    return None
@@ -0,0 +1,139 @@
+"""Streaming multipart uploads with early size and type checks."""
+import hashlib
+from typing import Optional
+from fastapi import Request, HTTPException
+
+try:
+    from python_multipart.exceptions import MultipartParseError
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:
+    from multipart.exceptions import MultipartParseError
+    from multipart.multipart import MultipartParser, parse_options_header
+
+# Allowance for multipart boundaries, part headers and small form fields
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+MAX_FIELD_BYTES = 4096
+
+
+class StreamedUpload:
+    """A file and the form fields received with it, read in one pass."""
+
+    def __init__(self):
+        self.fields: dict[str, str] = {}
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self.size = 0
+        self._chunks: list[bytes] = []
+        self._hash = hashlib.sha256()
+
+    @property
+    def data(self) -> bytes:
+        return b"".join(self._chunks)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+
+async def read_upload(
+    request: Request,
+    file_field: str,
+    max_bytes: int,
+    allowed_types: Optional[list] = None,
+    too_large_detail: str = "File too large.",
+    invalid_type_detail: str = "Invalid file type."
+) -> StreamedUpload:
+    """
+    Read a multipart/form-data request chunk by chunk as it arrives.
+
+    The upload is rejected as soon as its declared Content-Length, its part
+    content type, or the bytes actually received show it can't be accepted,
+    instead of after the whole body has been spooled. The file's SHA-256 is
+    computed on the same pass.
+
+    Args:
+        request: The incoming request
+        file_field: Name of the form field holding the file
+        max_bytes: Maximum file size
+        allowed_types: Accepted content types for the file, or None for any
+        too_large_detail: Error detail when the file exceeds max_bytes
+        invalid_type_detail: Error detail when the file type isn't allowed
+
+    Returns:
+        StreamedUpload with the file bytes, hash and the other form fields
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or b"boundary" not in params:
+        raise HTTPException(status_code=400, detail="Expected a multipart/form-data upload.")
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(status_code=400, detail=too_large_detail)
+
+    upload = StreamedUpload()
+    part = {"headers": {}, "field": b"", "value": b"", "name": None, "is_file": False}
+    # Set by the closing boundary; a truncated body never reaches it
+    complete = []
+
+    def on_part_begin():
+        part.update(headers={}, field=b"", value=b"", name=None, is_file=False)
+
+    def on_header_field(data, start, end):
+        part["field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        part["value"] += data[start:end]
+
+    def on_header_end():
+        part["headers"][part["field"].decode("latin-1").lower()] = part["value"].decode("latin-1")
+        part["field"], part["value"] = b"", b""
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(part["headers"].get("content-disposition", ""))
+        part["name"] = disposition.get(b"name", b"").decode()
+        part["is_file"] = part["name"] == file_field and b"filename" in disposition
+        if part["is_file"]:
+            upload.filename = disposition[b"filename"].decode()
+            upload.content_type = part["headers"].get("content-type")
+            if allowed_types is not None and upload.content_type not in allowed_types:
+                raise HTTPException(status_code=400, detail=invalid_type_detail)
+
+    def on_part_data(data, start, end):
+        chunk = data[start:end]
+        if part["is_file"]:
+            upload.size += len(chunk)
+            if upload.size > max_bytes:
+                raise HTTPException(status_code=400, detail=too_large_detail)
+            upload._hash.update(chunk)
+            upload._chunks.append(chunk)
+        else:
+            part["value"] += chunk
+            if len(part["value"]) > MAX_FIELD_BYTES:
+                raise HTTPException(status_code=400, detail=f"Form field '{part['name']}' is too large.")
+
+    def on_part_end():
+        if not part["is_file"] and part["name"]:
+            upload.fields[part["name"]] = part["value"].decode()
+
+    parser = MultipartParser(params[b"boundary"], callbacks={
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+        "on_end": lambda: complete.append(True),
+    })
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+        parser.finalize()
+        if not complete:
+            raise MultipartParseError("Body ended before the closing boundary")
+    except (MultipartParseError, UnicodeDecodeError) as e:
+        print(f"Rejected malformed multipart upload: {str(e)}")
+        raise HTTPException(status_code=400, detail="Malformed multipart body.")
+
+    if upload.filename is None:
+        raise HTTPException(status_code=400, detail=f"Missing file field '{file_field}'.")
+    return upload
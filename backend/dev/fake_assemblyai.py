@@ -0,0 +1,92 @@
+"""
+Fake AssemblyAI transcription server for offline development and load tests.
+
+Implements the subset of the REST API used by services.transcription:
+POST /v2/upload, POST /v2/transcript, GET /v2/transcript/{id}, and the
+completion webhook.
+
+Run with:
+    uvicorn dev.fake_assemblyai:app --port 8001
+and point the backend at it with ASSEMBLYAI_BASE_URL=http://localhost:8001.
+
+Audio URLs containing "error" produce a failed transcript. Set
+FAKE_TRANSCRIPT_DELAY_PER_MB to make uploaded files take longer the larger
+they are, like real transcription does.
+"""
+import asyncio
+import os
+import uuid
+from urllib.parse import parse_qs, urlsplit
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+
+DELAY_SECONDS = float(os.getenv("FAKE_TRANSCRIPT_DELAY_SECONDS", "2"))
+DELAY_PER_MB = float(os.getenv("FAKE_TRANSCRIPT_DELAY_PER_MB", "0"))
+TRANSCRIPT_TEXT = os.getenv(
+    "FAKE_TRANSCRIPT_TEXT",
+    "I led the migration of our billing service to an event-driven design "
+    "and cut invoice latency from minutes to seconds.",
+)
+
+app = FastAPI(title="Fake AssemblyAI")
+transcripts: dict[str, dict] = {}
+
+
+async def _complete(transcript_id: str, webhook: dict) -> None:
+    transcript = transcripts[transcript_id]
+    uploaded = parse_qs(urlsplit(transcript["audio_url"]).query).get("bytes", ["0"])[0]
+    await asyncio.sleep(DELAY_SECONDS + DELAY_PER_MB * int(uploaded) / (1024 * 1024))
+    if "error" in transcript["audio_url"]:
+        transcript.update(status="error", error="Fake transcription failure")
+    else:
+        transcript.update(status="completed", text=TRANSCRIPT_TEXT)
+
+    if webhook.get("webhook_url"):
+        headers = {}
+        if webhook.get("webhook_auth_header_name"):
+            headers[webhook["webhook_auth_header_name"]] = webhook.get("webhook_auth_header_value", "")
+        try:
+            async with httpx.AsyncClient() as client:
+                await client.post(
+                    webhook["webhook_url"],
+                    json={"transcript_id": transcript_id, "status": transcript["status"]},
+                    headers=headers,
+                    timeout=10,
+                )
+        except httpx.HTTPError as e:
+            print(f"Webhook delivery failed for {transcript_id}: {e}")
+
+
+@app.post("/v2/upload")
+async def upload(request: Request):
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+    if not size:
+        raise HTTPException(status_code=400, detail="Empty upload")
+    return {"upload_url": f"https://cdn.fake-assemblyai.local/upload/{uuid.uuid4().hex}?bytes={size}"}
+
+
+@app.post("/v2/transcript")
+async def create_transcript(request: Request):
+    body = await request.json()
+    if not body.get("audio_url"):
+        raise HTTPException(status_code=400, detail="audio_url is required")
+
+    transcript_id = uuid.uuid4().hex
+    transcripts[transcript_id] = {
+        "id": transcript_id,
+        "status": "queued",
+        "audio_url": body["audio_url"],
+        "text": None,
+        "error": None,
+    }
+    asyncio.create_task(_complete(transcript_id, body))
+    return transcripts[transcript_id]
+
+
+@app.get("/v2/transcript/{transcript_id}")
+async def get_transcript(transcript_id: str):
+    if transcript_id not in transcripts:
+        raise HTTPException(status_code=404, detail="Transcript not found")
+    return transcripts[transcript_id]
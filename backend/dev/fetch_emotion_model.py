@@ -0,0 +1,56 @@
+"""
+Download the FER+ emotion recognition model used by services.emotion_recognition.
+
+The weights aren't part of the repository. This fetches emotion-ferplus-8.onnx
+from the ONNX model zoo to EMOTION_MODEL_PATH (data/models/emotion-ferplus-8.onnx
+by default). Emotion analysis stays off until the model is in place and
+EMOTION_ANALYSIS_ENABLED=true is set.
+
+Run from backend/ (the usual .env must be present for the core package):
+    python -m dev.fetch_emotion_model [--force]
+"""
+import argparse
+import hashlib
+import os
+import requests
+
+from core.config import settings
+
+MODEL_URL = (
+    "https://github.com/onnx/models/raw/main/validated/vision/body_analysis/"
+    "emotion_ferplus/model/emotion-ferplus-8.onnx"
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default=MODEL_URL, help="where to download the ONNX model from")
+    parser.add_argument("--force", action="store_true", help="download even if the model already exists")
+    args = parser.parse_args()
+
+    path = settings.emotion_model_path
+    if os.path.exists(path) and not args.force:
+        print(f"Model already present at {path}")
+        return
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    digest = hashlib.sha256()
+    partial = f"{path}.part"
+    try:
+        with requests.get(args.url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            with open(partial, "wb") as f:
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    f.write(chunk)
+                    digest.update(chunk)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    os.replace(partial, path)
+    print(f"Saved {os.path.getsize(path) / 1024 / 1024:.1f} MB to {path} (sha256 {digest.hexdigest()})")
+
+
+if __name__ == "__main__":
+    main()
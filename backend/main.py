@@ -1,8 +1,11 @@
 """Main FastAPI application for HireVision backend."""
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from core.config import settings
+from core.job_queue import job_pool
+from core.process_pool import shutdown_pools
 from routers import (
     interviews_router,
     resumes_router,
@@ -10,13 +13,25 @@ from routers import (
     jobs_router,
     chat_router,
     health_router,
+    webhooks_router,
 )
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background job workers for the lifetime of the app."""
+    await job_pool.start()
+    yield
+    await job_pool.stop()
+    shutdown_pools()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="HireVision API",
     description="AI-powered video interview platform API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -35,6 +50,7 @@ app.include_router(resumes_router, prefix="/api")
 app.include_router(invites_router, prefix="/api")
 app.include_router(jobs_router, prefix="/api")
 app.include_router(chat_router, prefix="/api")
+app.include_router(webhooks_router, prefix="/api")
 
 
 @app.get("/")
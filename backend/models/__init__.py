@@ -2,6 +2,7 @@
 from .requests import (
     InterviewInvite,
     VideoURL,
+    BatchVideoAnalysisRequest,
     ResumeText,
     ResumeQuestionsRequest,
     GetPersonalizedQuestionsRequest,
@@ -12,6 +13,7 @@ from .requests import (
 __all__ = [
     "InterviewInvite",
     "VideoURL",
+    "BatchVideoAnalysisRequest",
     "ResumeText",
     "ResumeQuestionsRequest",
     "GetPersonalizedQuestionsRequest",
@@ -18,6 +18,14 @@ class VideoURL(BaseModel):
     question_index: Optional[int] = None
     question_text: Optional[str] = None
     recruiter_id: Optional[str] = None  # Added to fix the undefined variable bug
+    background: bool = False  # Queue the analysis and return a job id immediately
+
+
+class BatchVideoAnalysisRequest(BaseModel):
+    """Model for analyzing all answers of one interview in a single request."""
+    user_id: str
+    videos: list[VideoURL]
+    recruiter_id: Optional[str] = None
 
 
 class ResumeText(BaseModel):
@@ -29,6 +37,13 @@ class ResumeText(BaseModel):
 class ResumeQuestionsRequest(BaseModel):
     """Model for generating questions from resume."""
     user_id: str
+    regenerate: bool = False  # Ignore cached questions and ask the LLM again
+
+
+class BatchResumeQuestionsRequest(BaseModel):
+    """Model for generating questions for many candidates at once."""
+    user_ids: list[str]
+    regenerate: bool = False
 
 
 class GetPersonalizedQuestionsRequest(BaseModel):
@@ -47,3 +62,19 @@ class JobDescriptionUpdate(BaseModel):
     recruiter_id: str
     description: str
 
+
+
+class SignedUploadRequest(BaseModel):
+    """Model for requesting a signed direct-to-storage upload URL."""
+    user_id: str
+    filename: str
+    content_type: str
+    size_bytes: int
+
+
+class ResumeUploadComplete(BaseModel):
+    """Model for registering a resume uploaded directly to storage."""
+    user_id: str
+    path: str
+    original_name: str
+    content_type: str
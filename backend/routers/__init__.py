@@ -5,6 +5,7 @@ from .invites import router as invites_router
 from .jobs import router as jobs_router
 from .chat import router as chat_router
 from .health import router as health_router
+from .webhooks import router as webhooks_router
 
 __all__ = [
     "interviews_router",
@@ -13,5 +14,6 @@ __all__ = [
     "jobs_router",
     "chat_router",
     "health_router",
+    "webhooks_router",
 ]
 
@@ -1,14 +1,11 @@
 """Recruiter chat router."""
 from fastapi import APIRouter, HTTPException
-from openai import OpenAI
 
-from core.config import settings
 from models.requests import RecruiterChatRequest
+from services.llm_gateway import chat_text
 
 router = APIRouter(prefix="/api/chat", tags=["Chat"])
 
-client = OpenAI(api_key=settings.openai_api_key)
-
 
 @router.post("/recruiter")
 async def recruiter_chat(req: RecruiterChatRequest):
@@ -16,17 +13,16 @@ async def recruiter_chat(req: RecruiterChatRequest):
     try:
         system_prompt = "You are a concise assistant that helps recruiters. Keep replies under 120 words."
         
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
+        content = await chat_text(
+            [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": req.prompt},
             ],
+            route="chat",
             max_tokens=250,
             temperature=0.3,
         )
         
-        content = response.choices[0].message.content.strip()
         return {"reply": content}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
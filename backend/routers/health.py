@@ -1,6 +1,8 @@
 """Health check router."""
 from fastapi import APIRouter
 
+from core.metrics import metrics
+
 router = APIRouter(tags=["Health"])
 
 
@@ -9,3 +11,9 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "ok", "service": "HireVision API"}
 
+
+
+@router.get("/health/metrics")
+async def metrics_snapshot():
+    """In-process counters and latency summaries (LLM calls, tokens, ...)."""
+    return metrics.snapshot()
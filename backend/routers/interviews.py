@@ -1,58 +1,142 @@
 """Interview and video analysis router."""
+import asyncio
 import json
 from datetime import datetime
+from typing import Optional
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from core.config import settings
 from core.database import supabase
-from models.requests import VideoURL
+from core.job_queue import job_pool
+from core.storage import create_signed_upload, safe_object_name
+from models.requests import VideoURL, BatchVideoAnalysisRequest, SignedUploadRequest
+from services.job_descriptions import get_job_description
 from services.video_analysis import analyze_video
 
 router = APIRouter(prefix="/api/interviews", tags=["Interviews"])
 
+ANALYZE_VIDEO_JOB = "analyze_video"
+ACCEPTED_VIDEO_TYPES = ["video/webm", "video/mp4", "video/quicktime"]
+
+
+def _fetch_job_description(recruiter_id: Optional[str]) -> Optional[str]:
+    """Get the recruiter's job description, or None if unavailable."""
+    if not recruiter_id:
+        return None
+    try:
+        return get_job_description(recruiter_id)
+    except Exception as e:
+        print(f"Could not fetch job description: {e}")
+    return None
+
+
+def _answer_row(video: VideoURL, result: dict) -> dict:
+    """Build the interview_answers row for one analyzed answer."""
+    return {
+        'user_id': video.user_id,
+        'question_index': video.question_index,
+        'question_text': video.question_text or '',
+        'video_url': video.video_url,
+        'summary': result.get('summary', ''),
+        'transcript': result.get('transcript', ''),
+        'communication_analysis': json.dumps(result.get('communication_analysis', {})),
+        'behavioral_insights': json.dumps(result.get('behavioral_insights', {})),
+        'created_at': datetime.now().isoformat()
+    }
+
+
+def _store_answer(video: VideoURL, result: dict) -> None:
+    """Store analysis results in the interview_answers table with question index."""
+    if not video.user_id or video.question_index is None:
+        return
+    try:
+        supabase.table('interview_answers').upsert(_answer_row(video, result)).execute()
+        print(f"Analysis results stored for user {video.user_id}, question {video.question_index}")
+    except Exception as e:
+        print(f"Error storing analysis results: {str(e)}")
+
+
+def _store_answers(rows: list[dict]) -> int:
+    """Upsert many interview_answers rows in one write; returns the number stored."""
+    if not rows:
+        return 0
+    try:
+        supabase.table('interview_answers').upsert(rows).execute()
+        print(f"Analysis results stored for {len(rows)} answers")
+        return len(rows)
+    except Exception as e:
+        print(f"Error storing analysis results: {str(e)}")
+        return 0
+
+
+def _analysis_failed(result: Optional[dict]) -> bool:
+    """Whether analyze_video returned nothing or its error result."""
+    return not result or "error" in result
+
+
+async def run_video_analysis(video: VideoURL) -> Optional[dict]:
+    """Fetch context, analyze the video and store the results; failed analyses aren't stored."""
+    job_description = _fetch_job_description(video.recruiter_id)
+    result = await analyze_video(video.video_url, job_description)
+    if not _analysis_failed(result):
+        _store_answer(video, result)
+    return result
+
+
+async def _analyze_video_job(payload: dict) -> dict:
+    """Background job handler for queued video analysis; raises so failures mark the job failed."""
+    result = await run_video_analysis(VideoURL(**payload))
+    if not result:
+        raise RuntimeError("No result returned from analysis")
+    if "error" in result:
+        raise RuntimeError(result["error"])
+    return result
+
+
+job_pool.register(ANALYZE_VIDEO_JOB, _analyze_video_job)
+
+
+@router.post("/upload-url")
+async def create_video_upload_url(request: SignedUploadRequest):
+    """
+    Issue a signed URL for uploading an interview answer video directly to storage.
+    
+    The returned public_url is what /analyze-video takes as video_url.
+    """
+    if request.content_type not in ACCEPTED_VIDEO_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid file type. Only WebM, MP4 and MOV videos are allowed.")
+    if request.size_bytes > settings.media_ingest_max_mb * 1024 * 1024:
+        raise HTTPException(status_code=400, detail=f"File too large. Max size is {settings.media_ingest_max_mb}MB.")
+
+    path = f"{request.user_id}_{int(datetime.now().timestamp() * 1000)}_{safe_object_name(request.filename)}"
+    try:
+        signed = create_signed_upload('videos', path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create upload URL: {str(e)}")
+    return {"success": True, **signed}
+
 
 @router.post("/analyze-video")
 async def analyze_video_endpoint(video: VideoURL):
-    """Analyze video and store results."""
+    """
+    Analyze video and store results.
+    
+    With background=true the analysis is queued and a job id is returned
+    immediately; poll GET /jobs/{job_id} for status and results.
+    """
     try:
         print(f"Received request to analyze video: {video.video_url}")
-        
-        # Get job description if recruiter_id is provided
-        job_description = None
-        if video.recruiter_id:
-            try:
-                result = supabase.table('job_descriptions').select('description').eq(
-                    'recruiter_id', video.recruiter_id
-                ).execute()
-                if result.data and len(result.data) > 0:
-                    job_description = result.data[0].get('description')
-            except Exception as e:
-                print(f"Could not fetch job description: {e}")
-        
-        result = analyze_video(video.video_url, job_description)
+
+        if video.background:
+            job_id = job_pool.submit(ANALYZE_VIDEO_JOB, video.model_dump(exclude={"background"}))
+            return JSONResponse(status_code=202, content={"job_id": job_id, "status": "queued"})
+
+        result = await run_video_analysis(video)
 
         if not result:
             return {"error": "Failed to analyze video", "details": "No result returned from analysis"}
 
-        # Store results in Supabase if user_id is provided
-        if video.user_id and result:
-            try:
-                if video.question_index is not None:
-                    # Store in the interview_answers table with question index
-                    supabase.table('interview_answers').upsert({
-                        'user_id': video.user_id,
-                        'question_index': video.question_index,
-                        'question_text': video.question_text or '',
-                        'video_url': video.video_url,
-                        'summary': result.get('summary', ''),
-                        'transcript': result.get('transcript', ''),
-                        'communication_analysis': json.dumps(result.get('communication_analysis', {})),
-                        'behavioral_insights': json.dumps(result.get('behavioral_insights', {})),
-                        'created_at': datetime.now().isoformat()
-                    }).execute()
-                    print(f"Analysis results stored for user {video.user_id}, question {video.question_index}")
-            except Exception as e:
-                print(f"Error storing analysis results: {str(e)}")
-
         return result
     except ValueError as ve:
         print(f"Value error in endpoint: {str(ve)}")
@@ -62,9 +146,78 @@ async def analyze_video_endpoint(video: VideoURL):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/analyze-batch")
+async def analyze_batch_endpoint(batch: BatchVideoAnalysisRequest):
+    """
+    Analyze all answers of one interview.
+    
+    The job description is fetched once for the whole batch, answers are
+    analyzed with bounded parallelism, and results are streamed back as
+    NDJSON lines in completion order. All interview_answers rows are
+    upserted in a single write once the batch finishes.
+    """
+    if not batch.videos:
+        raise HTTPException(status_code=400, detail="No videos to analyze")
+
+    recruiter_id = batch.recruiter_id or batch.videos[0].recruiter_id
+    videos = [
+        video.model_copy(update={"user_id": batch.user_id, "recruiter_id": recruiter_id})
+        for video in batch.videos
+    ]
+    job_description = _fetch_job_description(recruiter_id)
+    semaphore = asyncio.Semaphore(settings.batch_analysis_concurrency)
+
+    async def analyze_one(index: int, video: VideoURL) -> tuple:
+        try:
+            async with semaphore:
+                result = await analyze_video(video.video_url, job_description)
+            return index, video, result or {"error": "No result returned from analysis"}, not _analysis_failed(result)
+        except Exception as e:
+            print(f"Error analyzing answer {index} for user {video.user_id}: {str(e)}")
+            return index, video, {"error": str(e)}, False
+
+    async def stream_results():
+        # One row per question: the upsert can't touch the same row twice, so the
+        # last answer in request order wins when a question index repeats
+        rows = {}
+        try:
+            for next_done in asyncio.as_completed(
+                [analyze_one(index, video) for index, video in enumerate(videos)]
+            ):
+                index, video, result, ok = await next_done
+                if ok and video.question_index is not None:
+                    if index >= rows.get(video.question_index, (-1, None))[0]:
+                        rows[video.question_index] = (index, _answer_row(video, result))
+                yield json.dumps({
+                    "index": index,
+                    "question_index": video.question_index,
+                    "result": result,
+                }) + "\n"
+        finally:
+            stored = _store_answers([row for _, row in rows.values()])
+        yield json.dumps({"done": True, "total": len(videos), "stored": stored}) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
+@router.get("/jobs/{job_id}")
+async def get_analysis_job(job_id: str):
+    """Get the status, and once finished the result, of a queued analysis."""
+    job = job_pool.queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "result": job["result"],
+        "error": job["error"],
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+    }
+
+
 # Legacy endpoint for backwards compatibility
 @router.post("/analyze-video", include_in_schema=False)
 async def analyze_video_legacy(video: VideoURL):
     """Legacy endpoint - redirects to new path."""
     return await analyze_video_endpoint(video)
-
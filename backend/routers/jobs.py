@@ -1,10 +1,9 @@
 """Job description management router."""
-from datetime import datetime
 from fastapi import APIRouter, HTTPException, Depends
 
-from core.database import supabase
 from core.auth import get_current_user_id
 from models.requests import JobDescriptionUpdate
+from services.job_descriptions import get_job_description as fetch_job_description, save_job_description
 
 router = APIRouter(prefix="/api/jobs", tags=["Job Descriptions"])
 
@@ -13,24 +12,8 @@ router = APIRouter(prefix="/api/jobs", tags=["Job Descriptions"])
 async def update_job_description(job_desc: JobDescriptionUpdate):
     """Update job description for an interview."""
     try:
-        existing = supabase.table('job_descriptions').select('id').eq(
-            'recruiter_id', job_desc.recruiter_id
-        ).execute()
-        
-        if existing.data and len(existing.data) > 0:
-            # Update existing job description
-            result = supabase.table('job_descriptions').update({
-                "description": job_desc.description,
-            }).eq('recruiter_id', job_desc.recruiter_id).execute()
-        else:
-            # Create new job description
-            result = supabase.table('job_descriptions').insert({
-                "recruiter_id": job_desc.recruiter_id,
-                "description": job_desc.description,
-                "created_at": datetime.now().isoformat(),
-            }).execute()
-        
-        return {"success": True, "data": result.data}
+        data = save_job_description(job_desc.recruiter_id, job_desc.description)
+        return {"success": True, "data": data}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -39,13 +22,7 @@ async def update_job_description(job_desc: JobDescriptionUpdate):
 async def get_job_description(recruiter_id: str):
     """Get job description for an interview."""
     try:
-        result = supabase.table('job_descriptions').select('description').eq(
-            'recruiter_id', recruiter_id
-        ).execute()
-        
-        if result and hasattr(result, 'data') and result.data and len(result.data) > 0:
-            return {"success": True, "description": result.data[0].get('description', '')}
-        return {"success": True, "description": ""}
+        return {"success": True, "description": fetch_job_description(recruiter_id) or ""}
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -57,14 +34,7 @@ async def get_job_description(recruiter_id: str):
 async def get_job_description_me(user_id: str = Depends(get_current_user_id)):
     """Get job description for the authenticated recruiter using Authorization header."""
     try:
-        result = supabase.table('job_descriptions').select('description').eq(
-            'recruiter_id', user_id
-        ).execute()
-        
-        if result.data and len(result.data) > 0:
-            return {"success": True, "description": result.data[0].get('description', '')}
-        else:
-            return {"success": True, "description": ""}
+        return {"success": True, "description": fetch_job_description(user_id) or ""}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -1,15 +1,34 @@
 """Resume management router."""
-import os
+import asyncio
+import contextlib
+import hashlib
+import json
 import time
-import tempfile
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-import pdfplumber
-import requests
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import httpx
 
+from core.config import settings
 from core.database import supabase
-from models.requests import ResumeQuestionsRequest, GetPersonalizedQuestionsRequest
-from services.question_generator import generate_personalized_questions_from_resume
+from core.storage import create_signed_upload, object_size, safe_object_name
+from core.uploads import read_upload
+from models.requests import (
+    ResumeQuestionsRequest,
+    BatchResumeQuestionsRequest,
+    GetPersonalizedQuestionsRequest,
+    SignedUploadRequest,
+    ResumeUploadComplete,
+)
+from services.question_cache import questions_for_resume
+from services.document_extraction import (
+    DocumentExtractionError,
+    FORMAT_MIME_TYPES,
+    SUPPORTED_MIME_TYPES,
+    extract_document_text,
+    sniff_format,
+)
 
 router = APIRouter(prefix="/api/resumes", tags=["Resumes"])
 
@@ -17,35 +36,136 @@ router = APIRouter(prefix="/api/resumes", tags=["Resumes"])
 ACCEPTED_RESUME_TYPES = [
     "application/pdf",
     "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-    "application/msword",
-    "text/rtf"
+    "text/rtf",
+    "application/rtf"
 ]
 MAX_RESUME_SIZE_MB = 5
+NUM_RESUME_QUESTIONS = 3
 
+# Request body documented for the upload endpoints, which parse the form themselves
+UPLOAD_REQUEST_SCHEMA = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file", "user_id"],
+                    "properties": {
+                        "file": {"type": "string", "format": "binary"},
+                        "user_id": {"type": "string"},
+                    },
+                }
+            }
+        },
+    }
+}
 
-@router.post("/upload")
-async def upload_resume(file: UploadFile = File(...), user_id: str = Form(...)):
-    """Upload resume file to Supabase storage."""
-    # Validate file type
-    if file.content_type not in ACCEPTED_RESUME_TYPES:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid file type. Only PDF, DOCX, and RTF are allowed."
-        )
+# Pooled client for the fallback download of resumes uploaded before text extraction
+_http = httpx.AsyncClient(timeout=30, follow_redirects=True)
+
+
+def _extract_text(contents: bytes) -> Optional[str]:
+    """Extract resume text from file bytes, or None if the document can't be read."""
+    try:
+        return extract_document_text(contents)
+    except DocumentExtractionError as e:
+        print(f"Could not extract resume text: {str(e)}")
+        return None
+
+
+def _store_resume_text(resume_id, contents: bytes) -> None:
+    """Background task: extract the uploaded resume's text and save it on its row."""
+    try:
+        text = _extract_text(contents)
+        if not text or not text.strip():
+            return
+        supabase.table("resumes").update({"resume_text": text}).eq("id", resume_id).execute()
+    except Exception as e:
+        print(f"Error extracting text for resume {resume_id}: {str(e)}")
+
+
+async def _download_resume(resume: dict) -> bytes:
+    """Download a stored resume file."""
+    response = await _http.get(resume["file_path"])
+    response.raise_for_status()
+    return response.content
+
+
+def _extract_and_backfill(resume: dict, contents: bytes) -> Optional[str]:
+    """
+    Extract the text of a resume uploaded before text was stored.
     
-    # Validate file size
-    contents = await file.read()
-    if len(contents) > MAX_RESUME_SIZE_MB * 1024 * 1024:
+    The text is saved on the row so later calls skip the download.
+    """
+    text = _extract_text(contents)
+    if text and text.strip():
+        supabase.table("resumes").update({
+            "resume_text": text,
+            "content_hash": hashlib.sha256(contents).hexdigest()
+        }).eq("id", resume["id"]).execute()
+    return text
+
+
+def _find_duplicate(user_id: str, content_hash: str) -> Optional[dict]:
+    """Return the user's existing resume row with the same content, if any."""
+    result = supabase.table("resumes").select("*").eq("user_id", user_id).eq(
+        "content_hash", content_hash
+    ).limit(1).execute()
+    return result.data[0] if result.data else None
+
+
+@router.post("/upload", openapi_extra=UPLOAD_REQUEST_SCHEMA)
+async def upload_resume(request: Request, background_tasks: BackgroundTasks):
+    """
+    Upload resume file to Supabase storage; its text is extracted in the background.
+    
+    The body is streamed: wrong file types and oversized files are rejected as
+    soon as that is known, and the file is hashed while it arrives. When the
+    same user uploads identical content again, the existing resume is reused
+    without another storage upload or parse.
+    """
+    upload = await read_upload(
+        request,
+        "file",
+        max_bytes=MAX_RESUME_SIZE_MB * 1024 * 1024,
+        allowed_types=ACCEPTED_RESUME_TYPES,
+        too_large_detail=f"File too large. Max size is {MAX_RESUME_SIZE_MB}MB.",
+        invalid_type_detail="Invalid file type. Only PDF, DOCX, and RTF are allowed."
+    )
+    user_id = upload.fields.get("user_id")
+    if not user_id:
+        raise HTTPException(status_code=400, detail="user_id is required.")
+    contents = upload.data
+    content_hash = upload.sha256
+    # The declared type is only a hint; the bytes have to be a format we can read
+    if sniff_format(contents) not in FORMAT_MIME_TYPES:
         raise HTTPException(
             status_code=400,
-            detail=f"File too large. Max size is {MAX_RESUME_SIZE_MB}MB."
+            detail="Invalid file type. Only PDF, DOCX, and RTF are allowed."
         )
     
-    # Upload to Supabase Storage
-    filename = f"{user_id}_{int(time.time())}_{file.filename}"
     try:
+        existing = _find_duplicate(user_id, content_hash)
+        if existing:
+            # Make it the latest resume again; storage and extracted text are already there
+            supabase.table("resumes").update({
+                "uploaded_at": datetime.utcnow().isoformat()
+            }).eq("id", existing["id"]).execute()
+            if not existing.get("resume_text"):
+                background_tasks.add_task(_store_resume_text, existing["id"], contents)
+            return {
+                "success": True,
+                "file_path": existing["file_path"],
+                "filename": existing["filename"],
+                "db_record": existing,
+                "duplicate": True
+            }
+        
+        # Upload to Supabase Storage
+        filename = f"{user_id}_{int(time.time())}_{upload.filename}"
         storage_response = supabase.storage.from_('resumes').upload(
-            filename, contents, {"content-type": file.content_type}
+            filename, contents, {"content-type": upload.content_type}
         )
         public_url = supabase.storage.from_('resumes').get_public_url(filename)
         
@@ -53,8 +173,9 @@ async def upload_resume(file: UploadFile = File(...), user_id: str = Form(...)):
             "user_id": user_id,
             "filename": filename,
             "file_path": public_url,
-            "original_name": file.filename,
-            "mime_type": file.content_type,
+            "original_name": upload.filename,
+            "mime_type": upload.content_type,
+            "content_hash": content_hash,
             "uploaded_at": datetime.utcnow().isoformat()
         }).execute()
         
@@ -63,71 +184,334 @@ async def upload_resume(file: UploadFile = File(...), user_id: str = Form(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload resume: {str(e)}")
     
+    # Parse from the bytes already in memory, after the response is sent
+    if db_record:
+        background_tasks.add_task(_store_resume_text, db_record["id"], contents)
+    
     return {
         "success": True,
         "file_path": public_url,
         "filename": filename,
-        "db_record": db_record
+        "db_record": db_record,
+        "duplicate": False
     }
 
 
+@router.post("/upload-url")
+async def create_resume_upload_url(request: SignedUploadRequest):
+    """
+    Issue a signed URL for uploading a resume directly to storage.
+    
+    The client PUTs the file to upload_url, then calls /upload-complete with
+    the returned path; the file itself never passes through the API.
+    """
+    if request.content_type not in ACCEPTED_RESUME_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Only PDF, DOCX, and RTF are allowed."
+        )
+    if request.size_bytes > MAX_RESUME_SIZE_MB * 1024 * 1024:
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Max size is {MAX_RESUME_SIZE_MB}MB."
+        )
+    
+    path = f"{request.user_id}_{int(time.time())}_{safe_object_name(request.filename)}"
+    try:
+        signed = create_signed_upload('resumes', path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create upload URL: {str(e)}")
+    return {"success": True, **signed}
+
+
+@router.post("/upload-complete")
+async def complete_resume_upload(request: ResumeUploadComplete, background_tasks: BackgroundTasks):
+    """
+    Register a resume uploaded through /upload-url once its object exists in storage.
+    
+    The signed URL can't enforce the size limit, so the object's size is
+    read from its storage metadata and oversized files are removed before
+    anything is downloaded. The rest matches /upload: the bytes must be a
+    format we can read, and identical content the user already uploaded
+    reuses the existing resume.
+    """
+    if not request.path.startswith(f"{request.user_id}_"):
+        raise HTTPException(status_code=400, detail="Upload path does not belong to this user.")
+    if request.content_type not in ACCEPTED_RESUME_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Only PDF, DOCX, and RTF are allowed."
+        )
+    bucket = supabase.storage.from_('resumes')
+    size = await asyncio.to_thread(object_size, 'resumes', request.path)
+    if size is None:
+        raise HTTPException(status_code=404, detail="Uploaded file not found in storage.")
+    if size > MAX_RESUME_SIZE_MB * 1024 * 1024:
+        await asyncio.to_thread(bucket.remove, [request.path])
+        raise HTTPException(
+            status_code=400,
+            detail=f"File too large. Max size is {MAX_RESUME_SIZE_MB}MB."
+        )
+    
+    try:
+        contents = await asyncio.to_thread(bucket.download, request.path)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read uploaded resume: {str(e)}")
+    # Guard against an object replaced between the size check and the download
+    if len(contents) > MAX_RESUME_SIZE_MB * 1024 * 1024 or sniff_format(contents) not in FORMAT_MIME_TYPES:
+        await asyncio.to_thread(bucket.remove, [request.path])
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid file type. Only PDF, DOCX, and RTF are allowed."
+        )
+    content_hash = hashlib.sha256(contents).hexdigest()
+    
+    try:
+        existing = _find_duplicate(request.user_id, content_hash)
+        if existing:
+            # Keep the stored copy the existing row points to and drop the new object
+            await asyncio.to_thread(bucket.remove, [request.path])
+            supabase.table("resumes").update({
+                "uploaded_at": datetime.utcnow().isoformat()
+            }).eq("id", existing["id"]).execute()
+            if not existing.get("resume_text"):
+                background_tasks.add_task(_store_resume_text, existing["id"], contents)
+            return {
+                "success": True,
+                "file_path": existing["file_path"],
+                "filename": existing["filename"],
+                "db_record": existing,
+                "duplicate": True
+            }
+        
+        public_url = bucket.get_public_url(request.path)
+        result = supabase.table("resumes").insert({
+            "user_id": request.user_id,
+            "filename": request.path,
+            "file_path": public_url,
+            "original_name": request.original_name,
+            "mime_type": request.content_type,
+            "content_hash": content_hash,
+            "uploaded_at": datetime.utcnow().isoformat()
+        }).execute()
+        db_record = result.data[0] if hasattr(result, 'data') and result.data else None
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to register resume: {str(e)}")
+    
+    if db_record:
+        background_tasks.add_task(_store_resume_text, db_record["id"], contents)
+    
+    return {
+        "success": True,
+        "file_path": public_url,
+        "filename": request.path,
+        "db_record": db_record,
+        "duplicate": False
+    }
+
+
+RESUME_COLUMNS = "id, user_id, file_path, original_name, mime_type, resume_text, uploaded_at"
+# PostgREST returns at most 1000 rows per request; ids go in the URL, so keep in_() lists short
+RESUME_PAGE_SIZE = 1000
+RESUME_ID_CHUNK = 200
+
+
+def _stored_questions(user_id: str, count: int) -> list:
+    """Texts of the user's latest stored resume questions, in question order."""
+    result = supabase.table("resume_questions") \
+        .select("question_index, question_text, created_at") \
+        .eq("user_id", user_id) \
+        .order("created_at", desc=True) \
+        .order("question_index", desc=False) \
+        .limit(count) \
+        .execute()
+    rows = result.data if result and result.data else []
+    return [q["question_text"] for q in sorted(rows, key=lambda x: x["question_index"])]
+
+
+def _question_rows(user_id: str, questions: list) -> list:
+    """Build the resume_questions rows for one generated set."""
+    created_at = datetime.now().isoformat()
+    return [
+        {
+            'user_id': user_id,
+            'question_index': idx,
+            'question_text': question['question'],
+            'created_at': created_at
+        }
+        for idx, question in enumerate(questions)
+    ]
+
+
+async def _questions_for_resume_row(
+    resume: dict,
+    regenerate: bool,
+    io_limit=None,
+    cpu_limit=None
+) -> tuple:
+    """
+    Run one resume through text extraction and question generation.
+    
+    io_limit and cpu_limit are optional semaphores held only around the
+    download/LLM steps and the parse step respectively, so a batch can keep
+    every stage busy at once.
+    
+    Returns:
+        (response dict with "questions" or "error", resume_questions rows to store)
+    """
+    io_limit = io_limit or contextlib.nullcontext()
+    cpu_limit = cpu_limit or contextlib.nullcontext()
+    user_id = resume["user_id"]
+    
+    text = resume.get("resume_text")
+    if not text and resume.get("mime_type") and resume["mime_type"] not in SUPPORTED_MIME_TYPES:
+        # Don't download what can't be parsed
+        return {"error": "Unsupported resume format. Only PDF, DOCX, and RTF can be read."}, []
+    if not text:
+        try:
+            async with io_limit:
+                contents = await _download_resume(resume)
+        except httpx.HTTPStatusError as e:
+            return {"error": f"Failed to download resume from storage. Status code: {e.response.status_code}"}, []
+        async with cpu_limit:
+            text = await asyncio.to_thread(_extract_and_backfill, resume, contents)
+    if not text or not text.strip():
+        return {"error": "Could not extract text from the resume."}, []
+    
+    # Generate questions, or reuse those already generated for this resume text
+    async with io_limit:
+        questions, cached = await questions_for_resume(
+            text, num_questions=NUM_RESUME_QUESTIONS, regenerate=regenerate
+        )
+        if not questions:
+            return {"error": "No questions could be generated from the resume."}, []
+        # Store questions unless the user already has this set
+        if cached and await asyncio.to_thread(_stored_questions, user_id, len(questions)) == [
+            q['question'] for q in questions
+        ]:
+            return {"questions": questions}, []
+    return {"questions": questions}, _question_rows(user_id, questions)
+
+
 @router.post("/generate-questions")
 async def generate_resume_questions_from_db(request: ResumeQuestionsRequest):
-    """Generate questions from the latest resume PDF in Supabase for a user."""
+    """
+    Generate questions from the stored text of a user's latest resume.
+    
+    Questions are cached by resume text, so an unchanged resume gets its
+    previous questions back without an LLM call or new resume_questions
+    rows. Set regenerate to force a fresh set.
+    """
     try:
         user_id = request.user_id
         
         # Fetch latest resume for user_id from Supabase
-        result = supabase.table("resumes").select(
-            "id, file_path, original_name, uploaded_at"
-        ).eq("user_id", user_id).order("uploaded_at", desc=True).limit(1).execute()
+        result = supabase.table("resumes").select(RESUME_COLUMNS).eq(
+            "user_id", user_id
+        ).order("uploaded_at", desc=True).limit(1).execute()
         
         if not result.data or len(result.data) == 0:
             return {"error": "No resume found for this user."}
         
-        resume = result.data[0]
-        pdf_url = resume["file_path"]
-        
-        # Download PDF from file_path
-        pdf_response = requests.get(pdf_url)
-        if pdf_response.status_code != 200:
-            return {"error": f"Failed to download PDF from storage. Status code: {pdf_response.status_code}"}
-        
-        # Extract text from PDF using temp file (thread-safe)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as temp_file:
-            temp_file.write(pdf_response.content)
-            temp_path = temp_file.name
-        
-        try:
-            with pdfplumber.open(temp_path) as pdf:
-                text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-        finally:
-            os.remove(temp_path)
-        
-        if not text.strip():
-            return {"error": "Could not extract text from the PDF."}
-        
-        # Generate questions using the service
-        questions = generate_personalized_questions_from_resume(text, num_questions=3)
-        if not questions:
-            return {"error": "No questions could be generated from the resume."}
-        
-        # Store questions in resume_questions table
-        for idx, question in enumerate(questions):
-            supabase.table('resume_questions').insert({
-                'user_id': user_id,
-                'question_index': idx,
-                'question_text': question['question'],
-                'created_at': datetime.now().isoformat()
-            }).execute()
-        
-        return {"questions": questions}
+        response, rows = await _questions_for_resume_row(result.data[0], request.regenerate)
+        if rows:
+            supabase.table('resume_questions').insert(rows).execute()
+        return response
         
     except Exception as e:
         print(f"Error in generate_resume_questions_from_db: {str(e)}")
         return {"error": str(e)}
 
 
+def _latest_resumes(user_ids: list) -> dict:
+    """
+    Return the latest resume row of each user, keyed by user_id.
+    
+    Only the small id columns of the users' resumes are scanned, page by
+    page since PostgREST caps a response at 1000 rows; resume text is
+    then fetched for the chosen ids alone.
+    """
+    latest_ids = {}
+    for start in range(0, len(user_ids), RESUME_ID_CHUNK):
+        chunk = user_ids[start:start + RESUME_ID_CHUNK]
+        offset = 0
+        while True:
+            result = supabase.table("resumes").select("id, user_id, uploaded_at").in_(
+                "user_id", chunk
+            ).order("uploaded_at", desc=True).order("id").range(
+                offset, offset + RESUME_PAGE_SIZE - 1
+            ).execute()
+            page = result.data or []
+            for resume in page:
+                latest_ids.setdefault(resume["user_id"], resume["id"])
+            if len(page) < RESUME_PAGE_SIZE or all(user_id in latest_ids for user_id in chunk):
+                break
+            offset += RESUME_PAGE_SIZE
+    
+    ids = list(latest_ids.values())
+    latest = {}
+    for start in range(0, len(ids), RESUME_ID_CHUNK):
+        result = supabase.table("resumes").select(RESUME_COLUMNS).in_(
+            "id", ids[start:start + RESUME_ID_CHUNK]
+        ).execute()
+        for resume in result.data or []:
+            latest[resume["user_id"]] = resume
+    return latest
+
+
+@router.post("/generate-questions/batch")
+async def generate_resume_questions_batch(batch: BatchResumeQuestionsRequest):
+    """
+    Generate questions for many candidates at once.
+    
+    The latest resumes of all candidates are fetched in one query, then each
+    candidate moves through download, parse and generation independently:
+    downloads and LLM calls share RESUME_BATCH_IO_CONCURRENCY slots and
+    parsing has RESUME_BATCH_CPU_CONCURRENCY slots. Results are streamed
+    back as NDJSON lines in completion order, and all new resume_questions
+    rows are inserted in a single write once the batch finishes.
+    """
+    user_ids = list(dict.fromkeys(batch.user_ids))
+    if not user_ids:
+        raise HTTPException(status_code=400, detail="No candidates given")
+    
+    latest = await asyncio.to_thread(_latest_resumes, user_ids)
+    
+    io_limit = asyncio.Semaphore(settings.resume_batch_io_concurrency)
+    cpu_limit = asyncio.Semaphore(settings.resume_batch_cpu_concurrency)
+    
+    async def generate_one(user_id: str) -> tuple:
+        if user_id not in latest:
+            return user_id, {"error": "No resume found for this user."}, []
+        try:
+            response, rows = await _questions_for_resume_row(
+                latest[user_id], batch.regenerate, io_limit, cpu_limit
+            )
+        except Exception as e:
+            print(f"Error generating questions for {user_id}: {str(e)}")
+            response, rows = {"error": str(e)}, []
+        return user_id, response, rows
+    
+    async def stream_results():
+        rows = []
+        stored = 0
+        try:
+            for next_done in asyncio.as_completed([generate_one(user_id) for user_id in user_ids]):
+                user_id, response, candidate_rows = await next_done
+                rows.extend(candidate_rows)
+                yield json.dumps({"user_id": user_id, **response}) + "\n"
+        finally:
+            if rows:
+                try:
+                    supabase.table('resume_questions').insert(rows).execute()
+                    stored = len(rows)
+                except Exception as e:
+                    print(f"Error storing resume questions: {str(e)}")
+        yield json.dumps({"done": True, "total": len(user_ids), "stored": stored}) + "\n"
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+
 @router.post("/get-personalized-questions")
 async def get_personalized_questions(request: GetPersonalizedQuestionsRequest):
     """Fetch the latest 3 personalized resume questions for a user."""
@@ -160,7 +544,7 @@ async def get_personalized_questions(request: GetPersonalizedQuestionsRequest):
 
 # Legacy endpoints for backwards compatibility
 @router.post("/upload-resume", include_in_schema=False)
-async def upload_resume_legacy(file: UploadFile = File(...), user_id: str = Form(...)):
+async def upload_resume_legacy(request: Request, background_tasks: BackgroundTasks):
     """Legacy endpoint - redirects to new path."""
-    return await upload_resume(file, user_id)
+    return await upload_resume(request, background_tasks)
 
@@ -0,0 +1,28 @@
+"""Webhook receivers for third-party services."""
+import hmac
+from fastapi import APIRouter, HTTPException, Request
+
+from core.config import settings
+from services.transcription import transcriber, WEBHOOK_AUTH_HEADER
+
+router = APIRouter(prefix="/api/webhooks", tags=["Webhooks"])
+
+
+@router.post("/assemblyai")
+async def assemblyai_webhook(request: Request):
+    """
+    Resume the analysis waiting on a transcript when AssemblyAI reports completion.
+
+    Served at /api/api/webhooks/assemblyai; ASSEMBLYAI_WEBHOOK_URL must point here.
+    """
+    if settings.assemblyai_webhook_secret:
+        provided = request.headers.get(WEBHOOK_AUTH_HEADER, "")
+        if not hmac.compare_digest(provided, settings.assemblyai_webhook_secret):
+            raise HTTPException(status_code=401, detail="Invalid webhook secret")
+
+    payload = await request.json()
+    transcript_id = payload.get("transcript_id")
+    if not transcript_id:
+        raise HTTPException(status_code=400, detail="Missing transcript_id")
+
+    return {"received": True, "waiting": transcriber.notify(transcript_id)}
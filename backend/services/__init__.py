@@ -1,19 +1,38 @@
 """Services for HireVision backend."""
-from .sentiment import summarize_text, analyze_communication, generate_behavioral_insights
+from .sentiment import (
+    summarize_text,
+    analyze_communication,
+    generate_behavioral_insights,
+    analyze_transcript_bundle,
+)
 from .email_service import send_interview_invite_email
-from .video_analysis import analyze_video, VideoAnalysisResult
-from .audio_analysis import detect_enthusiasm, extract_audio_from_video
+from .video_analysis import analyze_video, analyze_transcript, VideoAnalysisResult
+from .audio_analysis import (
+    detect_enthusiasm,
+    detect_enthusiasm_from_video,
+    analyze_prosody_from_video,
+    extract_audio_from_video,
+    stream_audio_from_video,
+)
 from .question_generator import generate_personalized_questions_from_resume
+from .resume_parser import extract_experiences, parse_resume_and_generate_questions
 
 __all__ = [
     "summarize_text",
     "analyze_communication", 
     "generate_behavioral_insights",
+    "analyze_transcript_bundle",
     "send_interview_invite_email",
     "analyze_video",
+    "analyze_transcript",
     "VideoAnalysisResult",
     "detect_enthusiasm",
+    "detect_enthusiasm_from_video",
+    "analyze_prosody_from_video",
     "extract_audio_from_video",
+    "stream_audio_from_video",
     "generate_personalized_questions_from_resume",
+    "extract_experiences",
+    "parse_resume_and_generate_questions",
 ]
 
@@ -1,8 +1,15 @@
 """Audio analysis service for enthusiasm detection."""
 import subprocess
+from typing import Iterator
 import librosa
 import numpy as np
 
+from .prosody import analyze_prosody, enthusiasm_timestamps, mask_runs, speech_mask
+
+# Frame geometry for RMS energy
+HOP_LENGTH = 512
+FRAME_LENGTH = 1024
+
 
 def detect_enthusiasm(
     audio_file: str,
@@ -25,27 +32,18 @@ def detect_enthusiasm(
     y, sr = librosa.load(audio_file, sr=sr)
 
     # Compute RMS energy for short frames
-    hop_length = 512
-    frame_length = 1024
-    rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-
-    # Normalize energy to 0-1 range
-    rms_norm = (rms - np.min(rms)) / (np.max(rms) - np.min(rms) + 1e-6)
+    rms = librosa.feature.rms(y=y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)[0]
+    return _enthusiasm_timestamps(rms, sr, HOP_LENGTH, energy_threshold)
 
-    # Identify frames where normalized energy exceeds the threshold
-    enthusiastic_frames = np.where(rms_norm > energy_threshold)[0]
 
-    # Convert frame indices to timestamps
-    timestamps = librosa.frames_to_time(enthusiastic_frames, sr=sr, hop_length=hop_length)
-    
-    # Filter out timestamps that are close together
-    filtered_timestamps = []
-    prev = -999
-    for t in timestamps:
-        if t - prev > 1.0:  # at least 1 second apart
-            filtered_timestamps.append(round(t, 2))
-            prev = t
-    return filtered_timestamps
+def _enthusiasm_timestamps(
+    rms: np.ndarray,
+    sr: int,
+    hop_length: int,
+    energy_threshold: float
+) -> list:
+    """Turn a frame-level RMS curve into enthusiasm timestamps at least 1 second apart."""
+    return enthusiasm_timestamps(rms, sr, hop_length, energy_threshold, min_gap_seconds=1.0)
 
 
 def extract_audio_from_video(video_url: str, output_audio: str) -> None:
@@ -62,3 +60,230 @@ def extract_audio_from_video(video_url: str, output_audio: str) -> None:
     command = ["ffmpeg", "-y", "-i", video_url, "-q:a", "0", "-map", "a", output_audio]
     subprocess.run(command, check=True)
 
+
+def extract_speech_audio(
+    video_url: str,
+    output_audio: str,
+    sr: int = 16000,
+    bitrate: str = "24k"
+) -> None:
+    """
+    Extract the audio track as compact mono Opus, enough for speech recognition.
+    
+    Args:
+        video_url: URL or path of the video
+        output_audio: Path of the .ogg file to write
+        sr: Sample rate to resample to
+        bitrate: Opus target bitrate
+        
+    Note: Uses ffmpeg subprocess - ensure video_url is validated before calling
+    """
+    command = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", video_url]
+    command += speech_encoder_args(sr, bitrate) + [output_audio]
+    subprocess.run(command, check=True, capture_output=True)
+
+
+def speech_encoder_args(sr: int = 16000, bitrate: str = "24k") -> list:
+    """ffmpeg output options for mono Opus speech audio (the first audio stream)."""
+    return [
+        "-map", "0:a:0", "-vn", "-ac", "1", "-ar", str(sr),
+        "-c:a", "libopus", "-b:a", bitrate, "-application", "voip",
+    ]
+
+
+def stream_audio_from_video(
+    video_url: str,
+    sr: int = 16000,
+    chunk_seconds: float = 1.0
+) -> Iterator[np.ndarray]:
+    """
+    Decode a video's audio track with ffmpeg straight into NumPy, chunk by chunk.
+    
+    ffmpeg writes mono float32 PCM to a pipe, so no temp file is written and
+    only one chunk is held in memory at a time.
+    
+    Args:
+        video_url: URL or path of the video
+        sr: Sample rate to decode to
+        chunk_seconds: Length of each yielded chunk
+        
+    Yields:
+        float32 arrays of at most sr * chunk_seconds samples
+        
+    Note: Uses ffmpeg subprocess - ensure video_url is validated before calling
+    """
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error",
+        "-i", video_url,
+        "-vn", "-ac", "1", "-ar", str(sr),
+        "-f", "f32le", "pipe:1",
+    ]
+    chunk_bytes = int(sr * chunk_seconds) * 4
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        while True:
+            data = process.stdout.read(chunk_bytes)
+            if not data:
+                break
+            # A short read at EOF may end mid-sample
+            usable = len(data) - len(data) % 4
+            if usable:
+                yield np.frombuffer(data[:usable], dtype=np.float32)
+    finally:
+        process.stdout.close()
+        stderr = process.stderr.read()
+        process.stderr.close()
+        returncode = process.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command, stderr=stderr)
+
+
+def chunked_rms(
+    chunks: Iterator[np.ndarray],
+    frame_length: int = FRAME_LENGTH,
+    hop_length: int = HOP_LENGTH
+) -> np.ndarray:
+    """
+    Compute frame-level RMS energy over a stream of sample chunks.
+    
+    Samples that don't yet fill a frame are carried over to the next chunk,
+    so the result matches framing the whole signal at once while only the
+    RMS curve (one value per hop) is kept in memory.
+    """
+    parts = []
+    carry = np.zeros(0, dtype=np.float32)
+    for chunk in chunks:
+        buffer = np.concatenate((carry, chunk))
+        if len(buffer) < frame_length:
+            carry = buffer
+            continue
+        frames = np.lib.stride_tricks.sliding_window_view(buffer, frame_length)[::hop_length]
+        parts.append(np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1)))
+        carry = buffer[len(frames) * hop_length:]
+    if not parts:
+        return np.zeros(0)
+    return np.concatenate(parts)
+
+
+def detect_enthusiasm_from_video(
+    video_url: str,
+    sr: int = 16000,
+    energy_threshold: float = 0.6
+) -> list:
+    """
+    Detect enthusiasm peaks directly from a video without a temp audio file.
+    
+    Args:
+        video_url: URL or path of the video
+        sr: Sample rate to decode to
+        energy_threshold: Threshold for detecting high energy (0-1)
+        
+    Returns:
+        List of timestamps where enthusiasm was detected
+    """
+    rms = chunked_rms(stream_audio_from_video(video_url, sr=sr))
+    if len(rms) == 0:
+        return []
+    return _enthusiasm_timestamps(rms, sr, HOP_LENGTH, energy_threshold)
+
+
+def analyze_prosody_from_video(
+    video_url: str,
+    sr: int = 16000,
+    energy_threshold: float = 0.6
+) -> dict:
+    """
+    Stream a video's audio through the prosody engine.
+    
+    Args:
+        video_url: URL or path of the video
+        sr: Sample rate to decode to
+        energy_threshold: Threshold for detecting high energy (0-1)
+        
+    Returns:
+        Energy, pitch, speaking-rate and pause statistics plus enthusiasm timestamps
+    """
+    return analyze_prosody(stream_audio_from_video(video_url, sr=sr), sr=sr, energy_threshold=energy_threshold)
+
+
+def split_on_silence(
+    audio_path: str,
+    sr: int = 16000,
+    max_segment_seconds: float = 60.0,
+    min_pause_seconds: float = 0.3,
+    pad_seconds: float = 0.2
+) -> list:
+    """
+    Find the speech in an audio file and split it into segments at pauses.
+    
+    Leading and trailing silence is dropped. Audio longer than
+    max_segment_seconds is cut in the longest pause of the second half of
+    each window (or at the window end if there is no pause), and the pause
+    itself is left out, so segments can be transcribed independently.
+    
+    Args:
+        audio_path: Path of the audio (or video) file
+        sr: Sample rate to decode to
+        max_segment_seconds: Maximum length of a segment
+        min_pause_seconds: Shortest silence considered a pause
+        pad_seconds: Silence kept at segment edges that border silence, so words aren't clipped
+        
+    Returns:
+        List of (start, end) times in seconds, empty if there is no speech
+    """
+    rms = chunked_rms(stream_audio_from_video(audio_path, sr=sr))
+    if len(rms) == 0:
+        return []
+    speech, _ = speech_mask(rms)
+    speech_idx = np.flatnonzero(speech)
+    if len(speech_idx) == 0:
+        return []
+
+    frame_seconds = HOP_LENGTH / sr
+    first, last = speech_idx[0], speech_idx[-1] + 1
+    max_frames = max(int(max_segment_seconds / frame_seconds), 1)
+
+    # Pauses between the first and last speech frame, as absolute frame ranges
+    pause_starts, pause_ends = mask_runs(~speech[first:last])
+    keep = (pause_ends - pause_starts) >= int(min_pause_seconds / frame_seconds)
+    pause_starts, pause_ends = pause_starts[keep] + first, pause_ends[keep] + first
+
+    # (start frame, end frame, padding before, padding after)
+    segments = []
+    start, start_pad = first, pad_seconds
+    while last - start > max_frames:
+        window = (pause_starts > start + max_frames // 2) & (pause_ends <= start + max_frames)
+        if window.any():
+            longest = np.flatnonzero(window)[np.argmax((pause_ends - pause_starts)[window])]
+            # Split the pause's silence between its two sides so the segments don't overlap
+            cut_pad = min(pad_seconds, (pause_ends[longest] - pause_starts[longest]) * frame_seconds / 2)
+            segments.append((start, pause_starts[longest], start_pad, cut_pad))
+            start, start_pad = pause_ends[longest], cut_pad
+        else:
+            # Forced cut mid-speech: padding would send the same audio twice
+            segments.append((start, start + max_frames, start_pad, 0.0))
+            start, start_pad = start + max_frames, 0.0
+    segments.append((start, last, start_pad, pad_seconds))
+
+    duration = (len(rms) - 1) * frame_seconds + FRAME_LENGTH / sr
+    return [
+        (round(max(s * frame_seconds - s_pad, 0.0), 3), round(min(e * frame_seconds + e_pad, duration), 3))
+        for s, e, s_pad, e_pad in segments
+    ]
+
+
+def encode_speech_segment(
+    audio_path: str,
+    output_audio: str,
+    start: float,
+    end: float,
+    sr: int = 16000,
+    bitrate: str = "24k"
+) -> None:
+    """Encode the [start, end) seconds of an audio file as mono Opus."""
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+        "-ss", str(start), "-t", str(end - start), "-i", audio_path,
+    ]
+    command += speech_encoder_args(sr, bitrate) + [output_audio]
+    subprocess.run(command, check=True, capture_output=True)
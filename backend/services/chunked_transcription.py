@@ -0,0 +1,106 @@
+"""Silence-aware chunked transcription: split at pauses, transcribe concurrently, stitch."""
+import asyncio
+import os
+import shutil
+import tempfile
+
+from core.config import settings
+from core.metrics import metrics
+from .audio_analysis import split_on_silence, encode_speech_segment
+from .transcription import transcriber
+
+
+class TranscriptionSegmentError(Exception):
+    """A segment still failed after its retries."""
+
+
+def stitch_transcripts(parts: list) -> dict:
+    """
+    Join per-segment transcripts in time order.
+
+    Args:
+        parts: (segment start in seconds, transcript resource) pairs
+
+    Returns:
+        Dict with the joined text and word timings shifted onto the original timeline
+    """
+    texts, words = [], []
+    for start, transcript in sorted(parts, key=lambda part: part[0]):
+        if transcript.get("text"):
+            texts.append(transcript["text"].strip())
+        offset_ms = int(round(start * 1000))
+        for word in transcript.get("words") or []:
+            words.append({**word, "start": word["start"] + offset_ms, "end": word["end"] + offset_ms})
+    return {"text": " ".join(texts) or None, "words": words}
+
+
+async def transcribe_chunked(audio_path: str) -> tuple:
+    """
+    Transcribe the speech in a local audio file as concurrent segment jobs.
+
+    Silence before the first and after the last word is never sent, and
+    long audio is split at pauses into segments of at most
+    TRANSCRIPTION_CHUNK_SECONDS, so time-to-transcript tracks the longest
+    segment rather than the whole answer. A failed segment is retried
+    TRANSCRIPTION_SEGMENT_RETRIES times; if it still fails, the speech is
+    transcribed as one job instead.
+
+    Args:
+        audio_path: Path of the decoded audio, e.g. IngestedMedia.audio_path
+
+    Returns:
+        (stitched transcript dict, bytes uploaded)
+    """
+    segments = await asyncio.to_thread(
+        split_on_silence, audio_path, max_segment_seconds=settings.transcription_chunk_seconds
+    )
+    if not segments:
+        return {"text": None, "words": []}, 0
+
+    limit = asyncio.Semaphore(settings.transcription_chunk_concurrency)
+    workdir = tempfile.mkdtemp(prefix="chunks-", dir=settings.media_ingest_dir or None)
+
+    async def transcribe_span(name: str, start: float, end: float) -> tuple:
+        path = os.path.join(workdir, f"{name}.ogg")
+        await asyncio.to_thread(
+            encode_speech_segment, audio_path, path, start, end,
+            bitrate=settings.transcription_opus_bitrate
+        )
+        upload_url = await transcriber.upload(path)
+        transcript = await transcriber.transcribe_detailed(upload_url)
+        return start, transcript, os.path.getsize(path)
+
+    async def transcribe_segment(index: int, start: float, end: float) -> tuple:
+        async with limit:
+            for attempt in range(settings.transcription_segment_retries + 1):
+                try:
+                    return await transcribe_span(f"{index:04d}", start, end)
+                except Exception as e:
+                    print(f"Segment {index} transcription failed (attempt {attempt + 1}): {str(e)}")
+                    metrics.increment("transcription.chunked.segment_errors")
+            raise TranscriptionSegmentError(f"Segment {index} failed after {attempt + 1} attempts")
+
+    tasks = [
+        asyncio.ensure_future(transcribe_segment(i, start, end)) for i, (start, end) in enumerate(segments)
+    ]
+    try:
+        try:
+            results = await asyncio.gather(*tasks)
+        except TranscriptionSegmentError as e:
+            # One segment kept failing: stop the rest and transcribe all the speech as a single job
+            print(f"{str(e)}, falling back to a single transcription")
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            metrics.increment("transcription.chunked.fallbacks")
+            results = [await transcribe_span("all", segments[0][0], segments[-1][1])]
+    finally:
+        for task in tasks:
+            task.cancel()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    metrics.increment("transcription.chunked.segments", len(segments))
+    metrics.increment("transcription.chunked.audio_seconds", sum(end - start for start, end in segments))
+    return stitch_transcripts([(start, transcript) for start, transcript, _ in results]), sum(
+        size for _, _, size in results
+    )
@@ -0,0 +1,273 @@
+"""Format-sniffing text extraction for resume documents (PDF, DOCX, RTF)."""
+import io
+import re
+import zipfile
+from typing import Optional
+from xml.etree import ElementTree
+
+from core.config import settings
+from .pdf_extraction import PDFExtractionError, extract_pdf_text
+
+# Rough size of a token in English text, used to turn the token budget into characters
+CHARS_PER_TOKEN = 4
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+RTF_MAGIC = b"{\\rtf"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+FORMAT_MIME_TYPES = {
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "rtf": "text/rtf",
+}
+SUPPORTED_MIME_TYPES = set(FORMAT_MIME_TYPES.values()) | {"application/rtf"}
+
+DOCX_BODY = "word/document.xml"
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+class DocumentExtractionError(Exception):
+    """Raised when a document's text can't be extracted."""
+
+
+class UnsupportedDocumentError(DocumentExtractionError):
+    """Raised for documents in a format there is no extractor for."""
+
+
+def sniff_format(data: bytes) -> Optional[str]:
+    """
+    Identify a document's format from its leading bytes.
+
+    Returns:
+        "pdf", "docx", "rtf", "doc" (legacy Word, not extractable) or None
+    """
+    head = data[:1024]
+    if PDF_MAGIC in head:
+        return "pdf"
+    if head.startswith(RTF_MAGIC):
+        return "rtf"
+    if head.startswith(OLE_MAGIC):
+        return "doc"
+    if head.startswith(ZIP_MAGIC):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                if DOCX_BODY in archive.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            return None
+    return None
+
+
+def _char_budget(max_tokens: Optional[int]) -> Optional[int]:
+    if max_tokens is None:
+        max_tokens = settings.resume_text_max_tokens
+    return max_tokens * CHARS_PER_TOKEN if max_tokens and max_tokens > 0 else None
+
+
+def cap_text(text: str, max_chars: Optional[int]) -> str:
+    """Cut text to at most max_chars, at a word boundary where possible."""
+    if max_chars is None or len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", max_chars - 200, max_chars)
+    return text[:cut if cut > 0 else max_chars]
+
+
+def extract_docx_text(data: bytes, max_chars: Optional[int] = None) -> str:
+    """
+    Extract the body text of a DOCX file.
+
+    document.xml is parsed as a stream straight out of the zip archive, one
+    paragraph at a time, and parsing stops once max_chars are collected.
+    """
+    parts = []
+    size = 0
+    with zipfile.ZipFile(io.BytesIO(data)) as archive, archive.open(DOCX_BODY) as body:
+        paragraph = []
+        for event, elem in ElementTree.iterparse(body, events=("end",)):
+            if elem.tag == f"{_W}t" and elem.text:
+                paragraph.append(elem.text)
+            elif elem.tag == f"{_W}tab":
+                paragraph.append("\t")
+            elif elem.tag in (f"{_W}br", f"{_W}cr"):
+                paragraph.append("\n")
+            elif elem.tag == f"{_W}p":
+                line = "".join(paragraph)
+                parts.append(line)
+                size += len(line) + 1
+                paragraph = []
+                # Drop the finished paragraph so memory stays flat on long documents
+                elem.clear()
+                if max_chars is not None and size >= max_chars:
+                    break
+    return "\n".join(parts)
+
+
+# Groups whose content is metadata, not document text
+RTF_DESTINATIONS = frozenset((
+    "aftncn", "aftnsep", "aftnsepc", "annotation", "atnauthor", "atndate", "atnicn", "atnid",
+    "atnparent", "atnref", "atntime", "atrfend", "atrfstart", "author", "background",
+    "bkmkend", "bkmkstart", "blipuid", "buptim", "category", "colorschememapping",
+    "colortbl", "comment", "company", "creatim", "datafield", "datastore", "defchp", "defpap",
+    "do", "doccomm", "docvar", "dptxbxtext", "ebcend", "ebcstart", "factoidname", "falt",
+    "fchars", "ffdeftext", "ffentrymcr", "ffexitmcr", "ffformat", "ffhelptext", "ffl",
+    "ffname", "ffstattext", "file", "filetbl", "fldinst", "fldtype", "fname",
+    "fontemb", "fontfile", "fonttbl", "footer", "footerf", "footerl", "footerr", "footnote",
+    "formfield", "ftncn", "ftnsep", "ftnsepc", "g", "generator", "gridtbl", "header",
+    "headerf", "headerl", "headerr", "hl", "hlfr", "hlinkbase", "hlloc", "hlsrc", "hsv",
+    "htmltag", "info", "keycode", "keywords", "latentstyles", "lchars", "levelnumbers",
+    "leveltext", "lfolevel", "linkval", "list", "listlevel", "listname", "listoverride",
+    "listoverridetable", "listpicture", "liststylename", "listtable", "listtext",
+    "lsdlockedexcept", "macc", "maccPr", "mailmerge", "maln", "malnScr", "manager", "margPr",
+    "mbar", "mbarPr", "mbaseJc", "mbegChr", "mborderBox", "mborderBoxPr", "mbox", "mboxPr",
+    "mchr", "mcount", "mctrlPr", "md", "mdeg", "mdegHide", "mden", "mdiff", "mdPr", "me",
+    "mendChr", "meqArr", "meqArrPr", "mf", "mfName", "mfPr", "mfunc", "mfuncPr", "mgroupChr",
+    "mgroupChrPr", "mgrow", "mhideBot", "mhideLeft", "mhideRight", "mhideTop", "mhtmltag",
+    "mlim", "mlimloc", "mlimlow", "mlimlowPr", "mlimupp", "mlimuppPr", "mm", "mmaddfieldname",
+    "mmath", "mmathPict", "mmathPr", "mmaxdist", "mmc", "mmcJc", "mmconnectstr",
+    "mmconnectstrdata", "mmcPr", "mmcs", "mmdatasource", "mmheadersource", "mmmailsubject",
+    "mmodso", "mmodsofilter", "mmodsofldmpdata", "mmodsomappedname", "mmodsoname",
+    "mmodsorecipdata", "mmodsosort", "mmodsosrc", "mmodsotable", "mmodsoudl",
+    "mmodsoudldata", "mmodsouniquetag", "mmPr", "mmquery", "mmr", "mnary", "mnaryPr",
+    "mnoBreak", "mnum", "mobjDist", "moMath", "moMathPara", "moMathParaPr", "mopEmu",
+    "mphant", "mphantPr", "mplcHide", "mpos", "mr", "mrad", "mradPr", "mrPr", "msepChr",
+    "mshow", "mshp", "msPre", "msPrePr", "msSub", "msSubPr", "msSubSup", "msSubSupPr", "msSup",
+    "msSupPr", "mstrikeBLTR", "mstrikeH", "mstrikeTLBR", "mstrikeV", "msub", "msubHide",
+    "msup", "msupHide", "mtransp", "mtype", "mvertJc", "mvfmf", "mvfml", "mvtof", "mvtol",
+    "mzeroAsc", "mzeroDesc", "mzeroWid", "nesttableprops", "nextfile", "nonesttables",
+    "objalias", "objclass", "objdata", "object", "objname", "objsect", "objtime", "oldcprops",
+    "oldpprops", "oldsprops", "oldtprops", "oleclsid", "operator", "panose", "password",
+    "passwordhash", "pgp", "pgptbl", "picprop", "pict", "pn", "pnseclvl", "pntext", "pntxta",
+    "pntxtb", "printim", "private", "propname", "protend", "protstart", "protusertbl", "pxe",
+    "result", "revtbl", "revtim", "rsidtbl", "rxe", "shp", "shpgrp", "shpinst", "shppict",
+    "shprslt", "shptxt", "sn", "sp", "staticval", "stylesheet", "subject", "sv", "svb", "tc",
+    "template", "themedata", "title", "txe", "ud", "upr", "userprops", "wgrffmtfilter",
+    "windowcaption", "writereservation", "writereservhash", "xe", "xform", "xmlattrname",
+    "xmlattrvalue", "xmlclose", "xmlname", "xmlnstbl", "xmlopen",
+))
+RTF_SPECIAL_CHARS = {
+    "par": "\n", "sect": "\n\n", "page": "\n\n", "line": "\n", "tab": "\t",
+    "emdash": "\u2014", "endash": "\u2013", "emspace": "\u2003", "enspace": "\u2002",
+    "qmspace": "\u2005", "bullet": "\u2022", "lquote": "\u2018", "rquote": "\u2019",
+    "ldblquote": "\u201c", "rdblquote": "\u201d", "row": "\n", "cell": " | ",
+}
+RTF_TOKEN = re.compile(
+    r"\\([a-z]{1,32})(-?\d{1,10})?[ ]?|\\'([0-9a-f]{2})|\\([^a-z])|([{}])|[\r\n]+|([^\\{}\r\n]+)",
+    re.IGNORECASE
+)
+
+
+def extract_rtf_text(data: bytes, max_chars: Optional[int] = None) -> str:
+    """
+    Extract the text of an RTF document.
+
+    A single tokenizer pass over the control words; groups holding
+    metadata (font tables, pictures, fields' instructions, ...) are skipped,
+    and the pass stops once max_chars are collected.
+    """
+    # RTF is 7-bit; anything else is escaped, so latin-1 decoding is lossless
+    source = data.decode("latin-1")
+    stack = []
+    ignorable = False
+    unicode_skip = 1
+    skip = 0
+    out = []
+    size = 0
+    for match in RTF_TOKEN.finditer(source):
+        word, arg, hex_code, symbol, brace, run = match.groups()
+        if brace:
+            skip = 0
+            if brace == "{":
+                stack.append((unicode_skip, ignorable))
+            elif stack:
+                unicode_skip, ignorable = stack.pop()
+            continue
+        if symbol:
+            skip = 0
+            if symbol == "~":
+                piece = "\u00a0"
+            elif symbol in "{}\\":
+                piece = symbol
+            elif symbol == "*":
+                ignorable = True
+                continue
+            else:
+                continue
+        elif word:
+            skip = 0
+            if word in RTF_DESTINATIONS:
+                ignorable = True
+                continue
+            if ignorable:
+                continue
+            if word in RTF_SPECIAL_CHARS:
+                piece = RTF_SPECIAL_CHARS[word]
+            elif word == "uc":
+                unicode_skip = int(arg or 1)
+                continue
+            elif word == "u" and arg:
+                code = int(arg)
+                piece = chr(code + 0x10000 if code < 0 else code)
+                skip = unicode_skip
+            else:
+                continue
+        elif hex_code:
+            if skip > 0:
+                skip -= 1
+                continue
+            piece = bytes([int(hex_code, 16)]).decode("cp1252", errors="replace")
+        elif run:
+            # Plain text; the first characters may be the ANSI fallback of a preceding \u
+            dropped = min(skip, len(run))
+            skip -= dropped
+            piece = run[dropped:]
+            if not piece:
+                continue
+        else:
+            continue
+
+        if ignorable:
+            continue
+        out.append(piece)
+        size += len(piece)
+        if max_chars is not None and size >= max_chars:
+            break
+    return "".join(out)
+
+
+def extract_document_text(data: bytes, max_tokens: Optional[int] = None) -> str:
+    """
+    Extract a resume's text, routing on the format sniffed from its bytes.
+
+    The declared content type is not trusted; the leading bytes pick the
+    parser. Output is capped at the token budget, and the DOCX and RTF
+    parsers stop reading once it is reached.
+
+    Args:
+        data: The document contents
+        max_tokens: Approximate token budget for the text (defaults to
+            RESUME_TEXT_MAX_TOKENS; 0 for no cap)
+
+    Returns:
+        The document text
+
+    Raises:
+        UnsupportedDocumentError: If the format has no extractor
+        DocumentExtractionError: If the document can't be read
+    """
+    max_chars = _char_budget(max_tokens)
+    kind = sniff_format(data)
+    try:
+        if kind == "pdf":
+            text = extract_pdf_text(data, max_chars=max_chars)
+        elif kind == "docx":
+            text = extract_docx_text(data, max_chars)
+        elif kind == "rtf":
+            text = extract_rtf_text(data, max_chars)
+        elif kind == "doc":
+            raise UnsupportedDocumentError("Legacy .doc files are not supported; save the resume as DOCX or PDF.")
+        else:
+            raise UnsupportedDocumentError("Unrecognized document format.")
+    except (PDFExtractionError, zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+        raise DocumentExtractionError(f"Could not read the {kind.upper()} document: {str(e)}") from e
+    return cap_text(text, max_chars)
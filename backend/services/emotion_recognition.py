@@ -1,26 +1,263 @@
-import requests
-import tempfile
+"""Frame-sampled facial emotion recognition on CPU with OpenCV."""
 import os
+import re
+import subprocess
+import tempfile
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Iterator, Optional
+import cv2
+import numpy as np
+import requests
+
+from core.config import settings
+from core.process_pool import emotion_pool
+
+# Output order of the FER+ model
+MODEL_LABELS = ["neutral", "happy", "surprise", "sad", "angry", "disgust", "fear", "contempt"]
+EMOTIONS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
+MODEL_INPUT_SIZE = 64
+
+# Faces are searched for on frames downscaled to at most this width
+DETECT_WIDTH = 320
+# Once found, a face is looked for in a window this much larger (relative to its size) first
+TRACK_MARGIN = 0.5
+
+# ffmpeg's progress timestamp, e.g. "time=00:01:02.40"
+PROGRESS_TIME = re.compile(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
+# Container durations beyond this are treated as garbage metadata
+MAX_DURATION_SECONDS = 24 * 60 * 60
+
+# Loaded once per process
+_net = None
+_detector = None
+
+
+def _load_models(model_path: str):
+    global _net, _detector
+    if _net is None:
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Emotion model not found at {model_path}")
+        _net = cv2.dnn.readNetFromONNX(model_path)
+        _net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        _net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        _detector = cv2.CascadeClassifier(
+            os.path.join(cv2.data.haarcascades, "haarcascade_frontalface_default.xml")
+        )
+    return _net, _detector
+
+
+def video_duration(capture, video_path: str) -> float:
+    """
+    Duration of an opened video in seconds, 0.0 if it can't be determined.
+
+    Frame count and fps from the container are used when they are plausible.
+    Browser MediaRecorder WebM has no duration and a garbage frame count, so
+    the video stream is then read through once with ffmpeg (stream copy, no
+    decoding) and its last timestamp is taken.
+    """
+    fps = capture.get(cv2.CAP_PROP_FPS) or 0
+    frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+    if fps > 0 and 0 < frame_count / fps < MAX_DURATION_SECONDS:
+        return frame_count / fps
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-nostdin", "-i", video_path, "-map", "0:v:0", "-c", "copy", "-f", "null", "-"],
+            capture_output=True, text=True, errors="replace", timeout=settings.emotion_analysis_timeout_seconds
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Could not read video duration with ffmpeg: {str(e)}")
+        return 0.0
+    times = PROGRESS_TIME.findall(result.stderr)
+    if not times:
+        return 0.0
+    hours, minutes, seconds = times[-1]
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+class FaceTracker:
+    """
+    Locate the candidate's face across sampled frames.
+
+    The face found in the previous sample is searched for first in a small
+    window around its last position, which is much cheaper than scanning the
+    whole frame; the full-frame detector only runs when tracking is lost.
+    """
+
+    def __init__(self, detector):
+        self.detector = detector
+        self.box: Optional[tuple[int, int, int, int]] = None
+
+    def locate(self, gray: np.ndarray) -> Optional[tuple[int, int, int, int]]:
+        """Return the face box (x, y, w, h) in gray, or None if there is no face."""
+        if self.box is not None:
+            x, y, w, h = self.box
+            margin = int(TRACK_MARGIN * max(w, h))
+            x0, y0 = max(x - margin, 0), max(y - margin, 0)
+            x1, y1 = min(x + w + margin, gray.shape[1]), min(y + h + margin, gray.shape[0])
+            # The face's scale changes little between samples, so bound the scale search too
+            found = self._detect(gray[y0:y1, x0:x1], int(0.7 * min(w, h)), int(1.4 * max(w, h)))
+            if found is not None:
+                fx, fy, fw, fh = found
+                self.box = (fx + x0, fy + y0, fw, fh)
+                return self.box
+        self.box = self._detect(gray)
+        return self.box
+
+    def _detect(self, gray: np.ndarray, min_size: int = 0, max_size: int = 0) -> Optional[tuple[int, int, int, int]]:
+        scale = min(1.0, DETECT_WIDTH / gray.shape[1])
+        small = cv2.resize(gray, None, fx=scale, fy=scale) if scale < 1.0 else gray
+        low = max(int(min_size * scale), 24)
+        high = int(max_size * scale)
+        faces = self.detector.detectMultiScale(
+            small, scaleFactor=1.1, minNeighbors=5,
+            minSize=(low, low), maxSize=(high, high) if high > low else (0, 0)
+        )
+        if len(faces) == 0:
+            return None
+        # The largest face is the candidate
+        x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+        return int(x / scale), int(y / scale), int(w / scale), int(h / scale)
+
+
+def _classify(net, crops: list, timestamps: list, boxes: list) -> list:
+    """Classify a batch of 64x64 grayscale face crops."""
+    blob = cv2.dnn.blobFromImages(crops, scalefactor=1.0, size=(MODEL_INPUT_SIZE, MODEL_INPUT_SIZE))
+    net.setInput(blob)
+    logits = net.forward().reshape(-1, len(MODEL_LABELS))
+    if len(logits) != len(crops):
+        # Some exports of the model have a fixed batch size of one
+        logits = np.concatenate([_forward_one(net, blob[i:i + 1]) for i in range(len(crops))])
+
+    exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+    probs = exp / exp.sum(axis=1, keepdims=True)
+    # Contempt is not part of the reported label set; count it as disgust
+    probs[:, MODEL_LABELS.index("disgust")] += probs[:, MODEL_LABELS.index("contempt")]
+
+    results = []
+    for t, box, p in zip(timestamps, boxes, probs):
+        emotions = {e: round(float(p[MODEL_LABELS.index(e)]), 4) for e in EMOTIONS}
+        results.append({
+            "timestamp": round(t, 2),
+            "face": list(box),
+            "dominant_emotion": max(emotions, key=emotions.get),
+            "emotions": emotions,
+        })
+    return results
+
+
+def _forward_one(net, blob: np.ndarray) -> np.ndarray:
+    net.setInput(blob)
+    return net.forward().reshape(1, len(MODEL_LABELS))
+
+
+def _classify_frames(frames: Iterator[tuple[float, np.ndarray]], model_path: str, batch_size: int) -> list:
+    """Find the face in each (timestamp, grayscale frame) and classify the crops in batches."""
+    net, detector = _load_models(model_path)
+    tracker = FaceTracker(detector)
+    results, crops, stamps, boxes = [], [], [], []
+    for t, gray in frames:
+        box = tracker.locate(gray)
+        if box is None:
+            continue
+        x, y, w, h = box
+        crops.append(cv2.resize(gray[y:y + h, x:x + w], (MODEL_INPUT_SIZE, MODEL_INPUT_SIZE)))
+        stamps.append(t)
+        boxes.append(box)
+        if len(crops) >= batch_size:
+            results.extend(_classify(net, crops, stamps, boxes))
+            crops, stamps, boxes = [], [], []
+    if crops:
+        results.extend(_classify(net, crops, stamps, boxes))
+    return results
+
+
+def _seek_frames(capture, timestamps: list) -> Iterator[tuple[float, np.ndarray]]:
+    for t in timestamps:
+        # Seeking decodes from the nearest keyframe instead of every frame in between
+        capture.set(cv2.CAP_PROP_POS_MSEC, t * 1000)
+        ok, frame = capture.read()
+        if ok:
+            yield t, cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+def _read_frames(paths: list, timestamps: list) -> Iterator[tuple[float, np.ndarray]]:
+    for t, path in zip(timestamps, paths):
+        gray = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if gray is not None:
+            yield t, gray
+
+
+def analyze_segment(
+    video_source: str,
+    timestamps: list,
+    model_path: str,
+    batch_size: int = 32,
+    single_thread: bool = False
+) -> list:
+    """
+    Seek to each timestamp, find the face and classify it.
+
+    Runs in a worker process for parallel segments, so it only takes
+    picklable arguments and loads the models itself.
+
+    Args:
+        video_source: Local path or URL OpenCV can open
+        timestamps: Sample times in seconds, ascending
+        model_path: Path of the FER+ ONNX model
+        batch_size: Number of face crops classified per forward pass
+        single_thread: Restrict OpenCV to one thread (when parallelism comes from processes)
+
+    Returns:
+        Per-frame results for the samples where a face was found
+    """
+    if single_thread:
+        cv2.setNumThreads(1)
+    capture = cv2.VideoCapture(video_source)
+    try:
+        return _classify_frames(_seek_frames(capture, timestamps), model_path, batch_size)
+    finally:
+        capture.release()
+
+
+def analyze_frame_files(
+    paths: list,
+    timestamps: list,
+    model_path: str,
+    batch_size: int = 32,
+    single_thread: bool = False
+) -> list:
+    """Like analyze_segment, for frames already extracted to image files."""
+    if single_thread:
+        cv2.setNumThreads(1)
+    return _classify_frames(_read_frames(paths, timestamps), model_path, batch_size)
+
 
 class VideoEmotionAnalyzer:
-    def __init__(self):
-        # No need to initialize the FER emotion detector
-        pass
-        
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        segment_seconds: Optional[float] = None
+    ):
+        self.model_path = model_path or settings.emotion_model_path
+        self.batch_size = batch_size or settings.emotion_batch_size
+        self.segment_seconds = segment_seconds or settings.emotion_segment_seconds
+
     def download_video(self, presigned_url):
         """Download video from Supabase presigned URL to a temporary file"""
         try:
             response = requests.get(presigned_url, stream=True)
             response.raise_for_status()
-            
+
             # Create temporary file
             temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
-            
+
             # Write video content to temporary file
             for chunk in response.iter_content(chunk_size=8192):
                 if chunk:
                     temp_file.write(chunk)
-                    
+
             temp_file.close()
             return temp_file.name
         except requests.exceptions.RequestException as e:
@@ -28,47 +265,133 @@ class VideoEmotionAnalyzer:
 
     def analyze_video(self, video_path, sample_rate=1):
         """
-        Return placeholder emotion data instead of actual analysis
+        Analyze facial emotions on frames sampled every sample_rate seconds.
+
+        Args:
+            video_path: Local path or URL of the video
+            sample_rate: Seconds between sampled frames
+
+        Returns:
+            Dict with summary and per-frame detailed_results
         """
-        # Return placeholder data
-        return self.summarize_results([])
-            
+        # Fail before starting any workers if the model is missing
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Emotion model not found at {self.model_path}")
+
+        capture = cv2.VideoCapture(video_path)
+        if not capture.isOpened():
+            raise ValueError(f"Could not open video: {video_path}")
+        duration = video_duration(capture, video_path)
+        capture.release()
+        timestamps = np.arange(0, duration, sample_rate).tolist()
+        if not timestamps:
+            print(f"No frames sampled for emotion analysis: could not determine the duration of {video_path}")
+
+        # Each segment is seeked and classified independently
+        results = self._run_segments([
+            (analyze_segment, video_path, segment) for segment in self._split(timestamps, sample_rate)
+        ])
+
+        summary = self.summarize_results(results)
+        summary["summary"]["frames_sampled"] = len(timestamps)
+        return summary
+
+    def analyze_frames(self, frame_paths, sample_rate=1):
+        """
+        Analyze facial emotions on frames already extracted every sample_rate seconds.
+
+        Args:
+            frame_paths: Image files of the sampled frames, in order
+            sample_rate: Seconds between sampled frames
+
+        Returns:
+            Dict with summary and per-frame detailed_results
+        """
+        if not os.path.exists(self.model_path):
+            raise FileNotFoundError(f"Emotion model not found at {self.model_path}")
+
+        timestamps = [i * sample_rate for i in range(len(frame_paths))]
+        if not timestamps:
+            print("No frames sampled for emotion analysis: the video yielded no frames")
+        results = self._run_segments([
+            (analyze_frame_files, paths, stamps)
+            for paths, stamps in zip(self._split(frame_paths, sample_rate), self._split(timestamps, sample_rate))
+        ])
+
+        summary = self.summarize_results(results)
+        summary["summary"]["frames_sampled"] = len(timestamps)
+        return summary
+
+    def _split(self, items, sample_rate):
+        """Split per-sample items into segments of segment_seconds."""
+        per_segment = max(int(self.segment_seconds // sample_rate), 1)
+        return [items[i:i + per_segment] for i in range(0, len(items), per_segment)]
+
+    def _run_segments(self, segments):
+        """Run (worker, source, timestamps) segments, in parallel across processes when there are several."""
+        if len(segments) > 1 and emotion_pool.workers > 1:
+            futures = [
+                emotion_pool.submit(worker, source, stamps, self.model_path, self.batch_size, True)
+                for worker, source, stamps in segments
+            ]
+            # Give up with the analysis stage, and free the workers still busy with this video
+            deadline = time.monotonic() + settings.emotion_analysis_timeout_seconds
+            try:
+                return [r for future in futures for r in future.result(timeout=max(deadline - time.monotonic(), 0))]
+            except FutureTimeoutError:
+                emotion_pool.retire(*futures)
+                raise
+        return [
+            r for worker, source, stamps in segments
+            for r in worker(source, stamps, self.model_path, self.batch_size)
+        ]
+
     def summarize_results(self, results):
-        """Provide placeholder emotion detection results"""
-        # Always return standardized placeholder data
+        """Average the per-frame emotion scores"""
+        if not results:
+            return {
+                "summary": {
+                    "total_frames_analyzed": 0,
+                    "dominant_emotion": None,
+                    "dominant_emotion_confidence": 0.0,
+                    "average_emotions": {e: 0.0 for e in EMOTIONS}
+                },
+                "detailed_results": []
+            }
+
+        scores = np.array([[r["emotions"][e] for e in EMOTIONS] for r in results])
+        average = scores.mean(axis=0)
+        dominant = int(average.argmax())
         return {
             "summary": {
-                "total_frames_analyzed": 0,
-                "dominant_emotion": "neutral",
-                "dominant_emotion_confidence": 0.7,
-                "average_emotions": {
-                    "angry": 0.05, 
-                    "disgust": 0.02, 
-                    "fear": 0.03,
-                    "happy": 0.15, 
-                    "sad": 0.05, 
-                    "surprise": 0.10, 
-                    "neutral": 0.60
-                }
+                "total_frames_analyzed": len(results),
+                "dominant_emotion": EMOTIONS[dominant],
+                "dominant_emotion_confidence": round(float(average[dominant]), 4),
+                "average_emotions": {e: round(float(a), 4) for e, a in zip(EMOTIONS, average)}
             },
-            "detailed_results": []
+            "detailed_results": results
         }
-        
+
 def analyze_emotions_from_url(presigned_url, sample_rate=1):
-    """Main function to provide placeholder emotions data"""
+    """Main function to analyze emotions of a video by URL"""
     analyzer = VideoEmotionAnalyzer()
-    
+    video_path = None
+
     try:
-        # Download video is still needed for compatibility
-        print("Downloading video...")
-        video_path = analyzer.download_video(presigned_url)
-        
-        # Get placeholder results
-        print("Providing placeholder emotion data...")
-        results = analyzer.analyze_video(video_path, sample_rate)
-        
-        # Cleanup
-        os.unlink(video_path)
-        return results
+        # OpenCV reads the URL with range requests, so only sampled frames are fetched
+        source = presigned_url
+        capture = cv2.VideoCapture(presigned_url)
+        if not capture.isOpened():
+            print("Streaming not available, downloading video...")
+            video_path = analyzer.download_video(presigned_url)
+            source = video_path
+        capture.release()
+
+        print("Analyzing emotions...")
+        return analyzer.analyze_video(source, sample_rate)
     except Exception as e:
         return {'error': str(e)}
+    finally:
+        # Cleanup
+        if video_path:
+            os.unlink(video_path)
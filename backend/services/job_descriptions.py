@@ -0,0 +1,69 @@
+"""Job descriptions with a read-through cache keyed by recruiter."""
+from typing import Optional
+
+from core.cache import make_cache
+from core.config import settings
+from core.database import supabase
+
+job_description_cache = make_cache(
+    settings.job_description_cache_backend,
+    path=settings.job_description_cache_path,
+    default_ttl=settings.job_description_cache_ttl_seconds,
+    max_entries=settings.job_description_cache_size,
+)
+
+
+def _key(recruiter_id: str) -> str:
+    return f"job_description:{recruiter_id}"
+
+
+def get_job_description(recruiter_id: str) -> Optional[str]:
+    """
+    Return a recruiter's job description, reading the database only on a cache miss.
+    
+    Recruiters without a description are cached too, so repeated lookups
+    for them don't hit the database either.
+    
+    Args:
+        recruiter_id: The recruiter's user id
+        
+    Returns:
+        The description, or None if the recruiter has none
+    """
+    if job_description_cache is not None:
+        entry = job_description_cache.get(_key(recruiter_id))
+        if entry is not None:
+            return entry["description"]
+
+    result = supabase.table('job_descriptions').select('description').eq(
+        'recruiter_id', recruiter_id
+    ).execute()
+    description = result.data[0].get('description') if result.data else None
+
+    if job_description_cache is not None:
+        job_description_cache.set(_key(recruiter_id), {"description": description})
+    return description
+
+
+def save_job_description(recruiter_id: str, description: str) -> list:
+    """
+    Create or replace a recruiter's job description in one upsert.
+    
+    The cached entry is dropped afterwards, so the next read sees the new
+    description (in every worker when the cache backend is shared).
+    
+    Returns:
+        The written rows
+    """
+    result = supabase.table('job_descriptions').upsert(
+        {"recruiter_id": recruiter_id, "description": description},
+        on_conflict="recruiter_id"
+    ).execute()
+    invalidate_job_description(recruiter_id)
+    return result.data
+
+
+def invalidate_job_description(recruiter_id: str) -> None:
+    """Drop a recruiter's cached job description."""
+    if job_description_cache is not None:
+        job_description_cache.delete(_key(recruiter_id))
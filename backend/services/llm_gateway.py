@@ -0,0 +1,137 @@
+"""Shared async gateway for OpenAI chat completions."""
+import asyncio
+import random
+import time
+from typing import Optional
+
+import openai
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+
+from core.artifact_store import artifact_store
+from core.config import settings
+from core.metrics import metrics
+
+DEFAULT_MODEL = "gpt-4o-mini"
+
+# Backoff for retried calls: full jitter over an exponentially growing window
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 8.0
+
+# One pooled client per process; retries are handled here, not by the SDK
+client = AsyncOpenAI(
+    api_key=settings.openai_api_key,
+    max_retries=0,
+    timeout=settings.llm_timeout_seconds,
+    http_client=DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_concurrency,
+            max_keepalive_connections=settings.llm_max_concurrency,
+        ),
+    ),
+)
+
+
+def _parse_route_limits(spec: str) -> dict[str, int]:
+    """Parse "route=limit,route=limit" into a dict."""
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        route, limit = item.split("=", 1)
+        limits[route.strip()] = int(limit)
+    return limits
+
+
+_route_limits = _parse_route_limits(settings.llm_route_concurrency)
+_global_semaphore: Optional[asyncio.Semaphore] = None
+_route_semaphores: dict[str, asyncio.Semaphore] = {}
+
+
+def _semaphores(route: str) -> tuple[asyncio.Semaphore, Optional[asyncio.Semaphore]]:
+    global _global_semaphore
+    if _global_semaphore is None:
+        _global_semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+    if route in _route_limits and route not in _route_semaphores:
+        _route_semaphores[route] = asyncio.Semaphore(_route_limits[route])
+    return _global_semaphore, _route_semaphores.get(route)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Honour Retry-After when the API sends one, otherwise use jittered backoff."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return min(float(response.headers.get("retry-after")), RETRY_MAX_DELAY)
+        except (TypeError, ValueError):
+            pass
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+
+
+async def _create(route: str, **kwargs):
+    attempt = 0
+    while True:
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except Exception as e:
+            if attempt >= settings.llm_max_retries or not _is_retryable(e):
+                raise
+            metrics.increment(f"llm.{route}.retries")
+            await asyncio.sleep(_retry_delay(e, attempt))
+            attempt += 1
+
+
+async def chat_completion(
+    messages: list[dict],
+    *,
+    route: str,
+    model: str = DEFAULT_MODEL,
+    **kwargs,
+):
+    """
+    Run a chat completion through the shared client.
+
+    Args:
+        messages: Chat messages to send
+        route: Name of the calling feature, used for concurrency limits and accounting
+        model: OpenAI model name
+        **kwargs: Extra arguments for chat.completions.create (max_tokens, temperature, ...)
+
+    Returns:
+        The ChatCompletion response
+    """
+    global_limit, route_limit = _semaphores(route)
+    start = time.perf_counter()
+    try:
+        async with global_limit:
+            if route_limit is not None:
+                async with route_limit:
+                    response = await _create(route, model=model, messages=messages, **kwargs)
+            else:
+                response = await _create(route, model=model, messages=messages, **kwargs)
+    except Exception:
+        metrics.increment(f"llm.{route}.errors")
+        raise
+    finally:
+        metrics.observe(f"llm.{route}.latency", time.perf_counter() - start)
+
+    metrics.increment(f"llm.{route}.calls")
+    if response.usage:
+        metrics.increment(f"llm.{route}.prompt_tokens", response.usage.prompt_tokens)
+        metrics.increment(f"llm.{route}.completion_tokens", response.usage.completion_tokens)
+    return response
+
+
+async def chat_text(messages: list[dict], *, route: str, **kwargs) -> str:
+    """Run a chat completion and return the stripped text of the first choice."""
+    response = await chat_completion(messages, route=route, **kwargs)
+    content = (response.choices[0].message.content or "").strip()
+    if settings.artifact_store_llm_outputs and content:
+        artifact_store.put(f"llm/{route}", content)
+    return content
@@ -0,0 +1,216 @@
+"""Download each video once and demux it for all analyzers."""
+import asyncio
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Optional
+import httpx
+
+from core.config import settings
+from core.metrics import metrics
+from .audio_analysis import speech_encoder_args
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+AUDIO_SAMPLE_RATE = 16000
+# Sampled frames are downscaled to at most this width
+FRAME_MAX_WIDTH = 640
+
+# One pooled client per process for storage downloads
+_client = httpx.AsyncClient(timeout=httpx.Timeout(30, read=60), follow_redirects=True)
+
+
+class MediaIngestError(Exception):
+    """Raised when a video can't be downloaded or demuxed."""
+
+
+class IngestedMedia:
+    """
+    Demuxed audio and sampled frames of one video, in a private temp directory.
+
+    The ingesting caller owns the first reference. Each consumer holds one
+    more via attach() for as long as its task runs, and the directory is
+    removed when the last reference is released, so the data lives exactly
+    as long as the slowest analyzer needs it.
+    """
+
+    def __init__(
+        self,
+        workdir: str,
+        audio_path: Optional[str],
+        speech_path: Optional[str],
+        frame_paths: list,
+        frame_interval: float,
+        bytes_downloaded: int
+    ):
+        self.workdir = workdir
+        self.audio_path = audio_path
+        self.speech_path = speech_path
+        self.frame_paths = frame_paths
+        self.frame_interval = frame_interval
+        self.bytes_downloaded = bytes_downloaded
+        self._refs = 1
+        self._lock = threading.Lock()
+
+    def retain(self) -> "IngestedMedia":
+        """Take a reference."""
+        with self._lock:
+            if self._refs == 0:
+                raise RuntimeError("Ingested media was already cleaned up")
+            self._refs += 1
+        return self
+
+    def release(self) -> None:
+        """Drop a reference, removing the temp data with the last one."""
+        with self._lock:
+            self._refs -= 1
+            remove = self._refs == 0
+        if remove:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def attach(self, task: asyncio.Future) -> asyncio.Future:
+        """Hold a reference until task finishes, however it finishes."""
+        self.retain()
+        task.add_done_callback(lambda _: self.release())
+        return task
+
+
+async def _run_process(command: list, check: bool = True) -> str:
+    """
+    Run a command without blocking the event loop and return its stderr.
+    
+    If the awaiting task is cancelled (e.g. by a stage timeout) the process
+    is killed rather than left running in the background.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *command, stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await process.communicate()
+    except BaseException:
+        if process.returncode is None:
+            process.kill()
+            await asyncio.shield(process.wait())
+        raise
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stderr=stderr)
+    return stderr.decode(errors="replace")
+
+
+async def _probe_streams(path: str) -> set:
+    """Return the stream types ("audio", "video") present in a media file."""
+    stderr = await _run_process(["ffmpeg", "-hide_banner", "-nostdin", "-i", path], check=False)
+    return {kind.lower() for kind in re.findall(r"Stream #\d+:\d+.*?: (Audio|Video):", stderr)}
+
+
+async def demux(
+    video_path: str,
+    workdir: str,
+    audio: bool = True,
+    speech: bool = False,
+    frame_interval: Optional[float] = None
+) -> tuple:
+    """
+    Split a video into audio and grayscale frames in one ffmpeg pass.
+
+    Args:
+        video_path: Path of the downloaded video
+        workdir: Directory to write the outputs to
+        audio: Whether to extract 16 kHz mono WAV audio for analysis
+        speech: Whether to also encode compact Opus audio for transcription
+        frame_interval: Seconds between sampled frames, or None for no frames
+
+    Returns:
+        (audio_path or None, speech_path or None, list of frame paths in time order)
+    """
+    streams = await _probe_streams(video_path)
+    command = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", video_path]
+
+    audio_path = None
+    if audio and "audio" in streams:
+        audio_path = os.path.join(workdir, "audio.wav")
+        command += ["-map", "0:a:0", "-ac", "1", "-ar", str(AUDIO_SAMPLE_RATE), "-c:a", "pcm_s16le", audio_path]
+
+    speech_path = None
+    if speech and "audio" in streams:
+        speech_path = os.path.join(workdir, "speech.ogg")
+        command += speech_encoder_args(AUDIO_SAMPLE_RATE, settings.transcription_opus_bitrate) + [speech_path]
+
+    frames_dir = None
+    if frame_interval and "video" in streams:
+        frames_dir = os.path.join(workdir, "frames")
+        os.makedirs(frames_dir)
+        command += [
+            "-map", "0:v:0",
+            "-vf", f"fps=1/{frame_interval},scale='min({FRAME_MAX_WIDTH},iw)':-2,format=gray",
+            os.path.join(frames_dir, "%06d.png"),
+        ]
+
+    if audio_path or speech_path or frames_dir:
+        await _run_process(command)
+    frame_paths = sorted(os.path.join(frames_dir, f) for f in os.listdir(frames_dir)) if frames_dir else []
+    return audio_path, speech_path, frame_paths
+
+
+async def _download(video_url: str, path: str) -> int:
+    max_bytes = settings.media_ingest_max_mb * 1024 * 1024
+    size = 0
+    async with _client.stream("GET", video_url) as resp:
+        resp.raise_for_status()
+        if int(resp.headers.get("content-length") or 0) > max_bytes:
+            raise MediaIngestError(f"Video is larger than {settings.media_ingest_max_mb} MB")
+        with open(path, "wb") as f:
+            async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise MediaIngestError(f"Video is larger than {settings.media_ingest_max_mb} MB")
+                await asyncio.to_thread(f.write, chunk)
+    return size
+
+
+async def ingest_media(
+    video_url: str,
+    audio: bool = True,
+    speech: bool = False,
+    frame_interval: Optional[float] = None
+) -> IngestedMedia:
+    """
+    Download a video once and demux it for the analyzers.
+
+    The downloaded file itself is deleted as soon as it is demuxed; only the
+    audio and frames are kept for the consumers.
+
+    Args:
+        video_url: URL of the video
+        audio: Whether to extract WAV audio for analysis
+        speech: Whether to encode compact Opus audio for transcription
+        frame_interval: Seconds between sampled frames, or None for no frames
+
+    Returns:
+        IngestedMedia owning one reference; release() it when done fanning out
+
+    Raises:
+        MediaIngestError: If the download or demux fails
+    """
+    start = time.perf_counter()
+    workdir = tempfile.mkdtemp(prefix="ingest-", dir=settings.media_ingest_dir or None)
+    video_path = os.path.join(workdir, "source")
+    try:
+        size = await _download(video_url, video_path)
+        audio_path, speech_path, frame_paths = await demux(video_path, workdir, audio, speech, frame_interval)
+        os.remove(video_path)
+    except BaseException as e:
+        # Also on cancellation (stage timeouts), which isn't an Exception
+        shutil.rmtree(workdir, ignore_errors=True)
+        metrics.increment("media.ingest.errors")
+        if isinstance(e, MediaIngestError) or not isinstance(e, Exception):
+            raise
+        raise MediaIngestError(f"Failed to ingest video: {str(e)}") from e
+
+    metrics.increment("media.ingest.bytes", size)
+    metrics.observe("media.ingest.latency", time.perf_counter() - start)
+    return IngestedMedia(workdir, audio_path, speech_path, frame_paths, frame_interval or 0, size)
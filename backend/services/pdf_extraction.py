@@ -0,0 +1,101 @@
+"""In-memory PDF text extraction with pypdfium2, page-parallel for large documents."""
+import io
+from typing import Optional
+import pdfplumber
+import pypdfium2 as pdfium
+
+from core.config import settings
+from core.process_pool import document_pool
+
+# Text on a dense resume page, for deciding whether a text budget makes splitting pointless
+APPROX_CHARS_PER_PAGE = 3000
+
+
+class PDFExtractionError(Exception):
+    """Raised when no engine can read the PDF."""
+
+
+def _pdfium_pages(data: bytes, start: int, stop: int, max_chars: Optional[int] = None) -> list:
+    """Extract the text of pages [start, stop) with pypdfium2, stopping after max_chars."""
+    pdf = pdfium.PdfDocument(data)
+    try:
+        texts = []
+        size = 0
+        for index in range(start, min(stop, len(pdf))):
+            page = pdf[index]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_bounded().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+            size += len(texts[-1]) + 1
+            if max_chars is not None and size >= max_chars:
+                break
+        return texts
+    finally:
+        pdf.close()
+
+
+def _pdfplumber_text(data: bytes) -> str:
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages)
+
+
+def pdf_page_count(data: bytes) -> int:
+    """Return the number of pages of a PDF held in memory."""
+    pdf = pdfium.PdfDocument(data)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+def extract_pdf_text(
+    data: bytes,
+    parallel_min_pages: Optional[int] = None,
+    max_chars: Optional[int] = None
+) -> str:
+    """
+    Extract the text of a PDF from its bytes, without a temp file.
+
+    pypdfium2 is used first; documents with at least parallel_min_pages pages
+    are split into page ranges extracted in the document process pool (pdfium
+    is not thread-safe, so parallelism has to come from processes). If
+    pypdfium2 can't open the file, pdfplumber is tried instead.
+
+    Args:
+        data: The PDF file contents
+        parallel_min_pages: Page count from which to extract in parallel
+            (defaults to PDF_PARALLEL_MIN_PAGES)
+        max_chars: Stop reading further pages once this much text is
+            collected; None reads every page
+
+    Returns:
+        Text of all pages joined by newlines
+
+    Raises:
+        PDFExtractionError: If neither engine can read the file
+    """
+    if parallel_min_pages is None:
+        parallel_min_pages = settings.pdf_parallel_min_pages
+    try:
+        pages = pdf_page_count(data)
+        workers = document_pool.workers
+        # When the first pages already fill the text budget, reading serially and stopping early is cheaper
+        within_budget = max_chars is None or pages * APPROX_CHARS_PER_PAGE <= max_chars
+        if within_budget and pages >= parallel_min_pages and workers > 1:
+            per_worker = -(-pages // workers)
+            futures = [
+                document_pool.submit(_pdfium_pages, data, start, start + per_worker)
+                for start in range(0, pages, per_worker)
+            ]
+            texts = [text for future in futures for text in future.result()]
+        else:
+            texts = _pdfium_pages(data, 0, pages, max_chars)
+        return "\n".join(texts)
+    except pdfium.PdfiumError as e:
+        print(f"pypdfium2 could not read the PDF, falling back to pdfplumber: {str(e)}")
+
+    try:
+        return _pdfplumber_text(data)
+    except Exception as e:
+        raise PDFExtractionError(f"Could not read the PDF: {str(e)}") from e
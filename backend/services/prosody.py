@@ -0,0 +1,311 @@
+"""Vectorized prosody engine: energy, pitch, speaking rate and pauses in one pass."""
+from typing import Iterable
+import numpy as np
+from numba import njit
+from scipy.ndimage import maximum_filter1d
+
+# Frame geometry at the input sample rate
+FRAME_LENGTH = 1024
+HOP_LENGTH = 512
+
+# Pitch search range and YIN threshold; pitch runs on a 2x decimated signal
+PITCH_FMIN = 75.0
+PITCH_FMAX = 400.0
+YIN_THRESHOLD = 0.15
+YIN_WINDOW = 256
+
+# Pauses shorter than this are treated as part of continuous speech
+MIN_PAUSE_SECONDS = 0.25
+# Minimum spacing between syllable nuclei for the speaking-rate proxy
+SYLLABLE_MIN_GAP_SECONDS = 0.12
+
+
+@njit(cache=True)
+def _frame_rms(y, frame_length, hop_length):
+    """RMS of every complete frame, from a running sum of squares."""
+    n_frames = (len(y) - frame_length) // hop_length + 1
+    out = np.empty(max(n_frames, 0), dtype=np.float64)
+    if n_frames <= 0:
+        return out
+    squares = np.empty(len(y) + 1, dtype=np.float64)
+    squares[0] = 0.0
+    for i in range(len(y)):
+        squares[i + 1] = squares[i] + y[i] * y[i]
+    for f in range(n_frames):
+        start = f * hop_length
+        total = squares[start + frame_length] - squares[start]
+        out[f] = np.sqrt(max(total, 0.0) / frame_length)
+    return out
+
+
+@njit(cache=True)
+def _yin_pitch(x, starts, voiced, window, tau_min, tau_max, threshold, sr):
+    """
+    YIN fundamental frequency for frames starting at starts (NaN if unvoiced).
+
+    Frames with voiced[i] == False are skipped so silence costs nothing.
+    """
+    out = np.full(len(starts), np.nan)
+    diff = np.empty(tau_max + 1, dtype=np.float64)
+    cmnd = np.empty(tau_max + 1, dtype=np.float64)
+    for i in range(len(starts)):
+        if not voiced[i]:
+            continue
+        s = starts[i]
+        diff[0] = 0.0
+        for tau in range(1, tau_max + 1):
+            acc = 0.0
+            for j in range(window):
+                d = x[s + j] - x[s + j + tau]
+                acc += d * d
+            diff[tau] = acc
+
+        # Cumulative mean normalized difference
+        running = 0.0
+        cmnd[0] = 1.0
+        for tau in range(1, tau_max + 1):
+            running += diff[tau]
+            cmnd[tau] = diff[tau] * tau / running if running > 0 else 1.0
+
+        # First dip under the threshold, followed down to its local minimum
+        best = -1
+        tau = tau_min
+        while tau < tau_max:
+            if cmnd[tau] < threshold:
+                while tau + 1 < tau_max and cmnd[tau + 1] < cmnd[tau]:
+                    tau += 1
+                best = tau
+                break
+            tau += 1
+        if best <= 0:
+            continue
+
+        # Parabolic interpolation around the dip
+        a, b, c = cmnd[best - 1], cmnd[best], cmnd[best + 1]
+        denom = a - 2 * b + c
+        shift = 0.5 * (a - c) / denom if denom != 0 else 0.0
+        out[i] = sr / (best + shift)
+    return out
+
+
+def pick_peaks(
+    values: np.ndarray,
+    threshold: float,
+    min_gap_frames: int
+) -> np.ndarray:
+    """
+    Indices of local maxima above threshold, at least min_gap_frames apart.
+
+    Non-maximum suppression with a sliding maximum leaves only a few
+    candidates, all but plateaus of equal maxima already far apart; those
+    are then thinned against the last kept peak, keeping the first.
+    """
+    if len(values) == 0:
+        return np.zeros(0, dtype=np.int64)
+    size = 2 * max(min_gap_frames, 1) + 1
+    local_max = maximum_filter1d(values, size=size, mode="constant", cval=-np.inf)
+    candidates = np.flatnonzero((values == local_max) & (values > threshold))
+    if len(candidates) < 2:
+        return candidates
+    kept = [candidates[0]]
+    for index in candidates[1:]:
+        if index - kept[-1] >= min_gap_frames:
+            kept.append(index)
+    return np.asarray(kept, dtype=np.int64)
+
+
+def mask_runs(mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end (exclusive) indices of runs of True in mask."""
+    padded = np.concatenate(([False], mask, [False]))
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8)))
+    return edges[0::2], edges[1::2]
+
+
+def speech_mask(rms: np.ndarray) -> tuple[np.ndarray, float]:
+    """
+    Classify frames as speech from an adaptive threshold between the noise
+    floor and loud speech.
+
+    Returns:
+        (boolean speech mask, threshold used)
+    """
+    floor, loud = np.percentile(rms, [10, 95])
+    threshold = floor + 0.1 * (loud - floor)
+    return rms > threshold, threshold
+
+
+class ProsodyAnalyzer:
+    """
+    Streaming prosody analysis over chunks of mono float32 audio.
+
+    Each chunk is framed with carry-over, and per-frame RMS and pitch are
+    computed by numba kernels; only these per-frame curves are kept, so
+    memory does not grow with the raw waveform. Call finish() for the
+    summary statistics.
+    """
+
+    def __init__(self, sr: int = 16000, frame_length: int = FRAME_LENGTH, hop_length: int = HOP_LENGTH):
+        if sr % 2 or hop_length % 2:
+            raise ValueError("sr and hop_length must be even for pitch decimation")
+        self.sr = sr
+        self.frame_length = frame_length
+        self.hop_length = hop_length
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._rms: list[np.ndarray] = []
+        self._pitch: list[np.ndarray] = []
+        self._samples = 0
+        # Pitch runs at sr / 2
+        self._tau_min = int(sr / 2 / PITCH_FMAX)
+        self._tau_max = int(sr / 2 / PITCH_FMIN)
+        if YIN_WINDOW + self._tau_max + 1 > frame_length // 2:
+            raise ValueError("frame_length too short for the pitch search range")
+        # Frames quieter than this are skipped by the pitch tracker
+        self.voicing_floor = 1e-3
+
+    def feed(self, chunk: np.ndarray) -> None:
+        """Add the next chunk of samples."""
+        self._samples += len(chunk)
+        buffer = np.concatenate((self._carry, chunk.astype(np.float32, copy=False)))
+        rms = _frame_rms(buffer, self.frame_length, self.hop_length)
+        n_frames = len(rms)
+        if n_frames == 0:
+            self._carry = buffer
+            return
+
+        even = buffer[: len(buffer) // 2 * 2]
+        decimated = 0.5 * (even[0::2] + even[1::2])
+        starts = np.arange(n_frames, dtype=np.int64) * (self.hop_length // 2)
+        pitch = _yin_pitch(
+            decimated, starts, rms > self.voicing_floor, YIN_WINDOW,
+            self._tau_min, self._tau_max, YIN_THRESHOLD, self.sr / 2,
+        )
+
+        self._rms.append(rms)
+        self._pitch.append(pitch)
+        self._carry = buffer[n_frames * self.hop_length:]
+
+    def finish(self, energy_threshold: float = 0.6, min_gap_seconds: float = 1.0) -> dict:
+        """
+        Summarize the stream.
+
+        Args:
+            energy_threshold: Normalized energy (0-1) above which a peak counts as enthusiasm
+            min_gap_seconds: Minimum spacing between enthusiasm timestamps
+
+        Returns:
+            Dict with duration, energy, pitch, speaking-rate and pause statistics
+            plus enthusiasm timestamps
+        """
+        rms = np.concatenate(self._rms) if self._rms else np.zeros(0)
+        pitch = np.concatenate(self._pitch) if self._pitch else np.zeros(0)
+        return summarize_prosody(
+            rms, pitch, self.sr, self.hop_length, self._samples / self.sr,
+            energy_threshold, min_gap_seconds,
+        )
+
+
+def summarize_prosody(
+    rms: np.ndarray,
+    pitch: np.ndarray,
+    sr: int,
+    hop_length: int,
+    duration: float,
+    energy_threshold: float = 0.6,
+    min_gap_seconds: float = 1.0
+) -> dict:
+    """Turn per-frame RMS and pitch curves into prosody statistics."""
+    frame_seconds = hop_length / sr
+    result = {
+        "duration_seconds": round(duration, 2),
+        "speech_ratio": 0.0,
+        "energy": {"mean": 0.0, "std": 0.0},
+        "pitch": {"mean_hz": 0.0, "std_hz": 0.0, "range_hz": 0.0, "voiced_ratio": 0.0},
+        "speaking_rate": {"syllables_per_second": 0.0},
+        "pauses": {"count": 0, "total_seconds": 0.0, "mean_seconds": 0.0, "max_seconds": 0.0},
+        "enthusiasm_timestamps": [],
+    }
+    if len(rms) == 0:
+        return result
+
+    speech, speech_threshold = speech_mask(rms)
+    result["speech_ratio"] = round(float(speech.mean()), 3)
+    result["energy"] = {"mean": round(float(rms.mean()), 5), "std": round(float(rms.std()), 5)}
+
+    voiced = ~np.isnan(pitch)
+    if voiced.any():
+        f0 = pitch[voiced]
+        low, high = np.percentile(f0, [5, 95])
+        result["pitch"] = {
+            "mean_hz": round(float(f0.mean()), 1),
+            "std_hz": round(float(f0.std()), 1),
+            "range_hz": round(float(high - low), 1),
+            "voiced_ratio": round(float(voiced.mean()), 3),
+        }
+
+    # Speaking-rate proxy: energy peaks (syllable nuclei) per second of speech
+    speech_seconds = speech.sum() * frame_seconds
+    if speech_seconds > 0:
+        nuclei = pick_peaks(
+            np.where(speech, rms, 0.0), speech_threshold,
+            int(SYLLABLE_MIN_GAP_SECONDS / frame_seconds),
+        )
+        result["speaking_rate"] = {"syllables_per_second": round(len(nuclei) / speech_seconds, 2)}
+
+    # Pauses: silent runs between the first and last speech frame
+    speech_idx = np.flatnonzero(speech)
+    if len(speech_idx):
+        inner = ~speech[speech_idx[0]:speech_idx[-1] + 1]
+        starts, ends = mask_runs(inner)
+        lengths = (ends - starts) * frame_seconds
+        lengths = lengths[lengths >= MIN_PAUSE_SECONDS]
+        if len(lengths):
+            result["pauses"] = {
+                "count": int(len(lengths)),
+                "total_seconds": round(float(lengths.sum()), 2),
+                "mean_seconds": round(float(lengths.mean()), 2),
+                "max_seconds": round(float(lengths.max()), 2),
+            }
+
+    result["enthusiasm_timestamps"] = enthusiasm_timestamps(
+        rms, sr, hop_length, energy_threshold, min_gap_seconds
+    )
+    return result
+
+
+def enthusiasm_timestamps(
+    rms: np.ndarray,
+    sr: int,
+    hop_length: int,
+    energy_threshold: float = 0.6,
+    min_gap_seconds: float = 1.0
+) -> list:
+    """Timestamps (seconds) of normalized energy peaks above threshold, min_gap_seconds apart."""
+    if len(rms) == 0:
+        return []
+    rms_norm = (rms - np.min(rms)) / (np.max(rms) - np.min(rms) + 1e-6)
+    peaks = pick_peaks(rms_norm, energy_threshold, max(int(round(min_gap_seconds * sr / hop_length)), 1))
+    return np.round(peaks * hop_length / sr, 2).tolist()
+
+
+def analyze_prosody(
+    chunks: Iterable[np.ndarray],
+    sr: int = 16000,
+    energy_threshold: float = 0.6,
+    min_gap_seconds: float = 1.0
+) -> dict:
+    """
+    Run the prosody engine over an iterable of audio chunks.
+
+    Args:
+        chunks: Mono float32 sample chunks, e.g. from stream_audio_from_video
+        sr: Sample rate of the chunks
+        energy_threshold: Normalized energy (0-1) above which a peak counts as enthusiasm
+        min_gap_seconds: Minimum spacing between enthusiasm timestamps
+
+    Returns:
+        Prosody statistics; see ProsodyAnalyzer.finish
+    """
+    analyzer = ProsodyAnalyzer(sr=sr)
+    for chunk in chunks:
+        analyzer.feed(chunk)
+    return analyzer.finish(energy_threshold, min_gap_seconds)
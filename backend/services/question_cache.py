@@ -0,0 +1,60 @@
+"""Cache of generated resume questions keyed by resume content."""
+import hashlib
+from typing import Optional
+
+from core.cache import make_cache
+from core.config import settings
+from .question_generator import QUESTIONS_PROMPT_VERSION, generate_personalized_questions_from_resume
+
+question_cache = make_cache(
+    settings.question_cache_backend,
+    path=settings.question_cache_path,
+    default_ttl=settings.question_cache_ttl_seconds,
+    max_bytes=settings.question_cache_max_mb * 1024 * 1024,
+)
+
+
+def question_cache_key(resume_text: str, num_questions: int) -> str:
+    """Key for a resume's questions: text hash, question count and prompt version."""
+    digest = hashlib.sha256(resume_text.encode()).hexdigest()
+    return f"questions:v{QUESTIONS_PROMPT_VERSION}:{num_questions}:{digest}"
+
+
+def get_cached_questions(resume_text: str, num_questions: int) -> Optional[list]:
+    """Return the cached questions for a resume, if any."""
+    if question_cache is None:
+        return None
+    entry = question_cache.get(question_cache_key(resume_text, num_questions))
+    return entry["questions"] if entry else None
+
+
+def cache_questions(resume_text: str, num_questions: int, questions: list) -> None:
+    """Store the questions generated for a resume."""
+    if question_cache is None or not questions:
+        return
+    question_cache.set(question_cache_key(resume_text, num_questions), {"questions": questions})
+
+
+async def questions_for_resume(
+    resume_text: str,
+    num_questions: int = 3,
+    regenerate: bool = False
+) -> tuple:
+    """
+    Return personalized questions for a resume, generating them only on a cache miss.
+    
+    Args:
+        resume_text: The text content of the resume
+        num_questions: Number of questions to generate
+        regenerate: Skip the cache lookup and generate fresh questions
+        
+    Returns:
+        (list of {"question": ...} dicts, whether they came from the cache)
+    """
+    if not regenerate:
+        cached = get_cached_questions(resume_text, num_questions)
+        if cached:
+            return cached, True
+    questions = await generate_personalized_questions_from_resume(resume_text, num_questions=num_questions)
+    cache_questions(resume_text, num_questions, questions)
+    return questions, False
@@ -1,14 +1,14 @@
 """Question generation service using OpenAI."""
 import re
 import json
-from openai import OpenAI
 
-from core.config import settings
+from .llm_gateway import chat_text
 
-client = OpenAI(api_key=settings.openai_api_key)
+# Bump when the prompt or parsing changes so cached questions are regenerated
+QUESTIONS_PROMPT_VERSION = 1
 
 
-def generate_personalized_questions_from_resume(
+async def generate_personalized_questions_from_resume(
     resume_text: str,
     num_questions: int = 3
 ) -> list[dict]:
@@ -31,17 +31,15 @@ def generate_personalized_questions_from_resume(
         f"Example: [{{\"question\": \"...\"}}, ...]"
     )
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    raw_content = await chat_text(
+        [
             {"role": "system", "content": "You are an expert technical interviewer."},
             {"role": "user", "content": prompt}
         ],
+        route="questions",
         max_tokens=512,
         temperature=0.5
     )
-    
-    raw_content = response.choices[0].message.content.strip()
     print("Raw content in generate_personalized_questions_from_resume: ", raw_content)
 
     # Remove markdown code block markers if present
@@ -1,263 +1,313 @@
-# import re
-# import json
-# import requests
-# import io
-# from typing import List, Dict, Any
-# from openai import OpenAI
-# import os
-# from dotenv import load_dotenv
-# import PyPDF2
-
-# load_dotenv()
-# client = OpenAI(api_key=os.getenv("OPEN_AI_API_KEY"))
-
-# class ResumeParser:
-#     def __init__(self):
-#         self.client = client
-    
-#     def extract_text_from_pdf(self, pdf_url: str) -> str:
-#         """
-#         Download PDF from URL and extract text content
-#         """
-#         try:
-#             # Download the PDF from the URL
-#             response = requests.get(pdf_url, timeout=30)
-#             response.raise_for_status()
-            
-#             # Read the PDF content
-#             pdf_content = io.BytesIO(response.content)
-            
-#             # Extract text from PDF
-#             pdf_reader = PyPDF2.PdfReader(pdf_content)
-#             text = ""
-            
-#             for page in pdf_reader.pages:
-#                 text += page.extract_text() + "\n"
-            
-#             return text.strip()
-            
-#         except requests.RequestException as e:
-#             raise Exception(f"Failed to download PDF from URL: {str(e)}")
-#         except Exception as e:
-#             raise Exception(f"Failed to extract text from PDF: {str(e)}")
-    
-#     def extract_experiences(self, resume_input: str, is_pdf_url: bool = False) -> List[Dict[str, Any]]:
-#         """
-#         Extract work experiences from resume text or PDF URL using regex patterns
-        
-#         Args:
-#             resume_input: Either resume text or PDF URL
-#             is_pdf_url: Boolean indicating if the input is a PDF URL
-#         """
-#         # If it's a PDF URL, extract text first
-#         if is_pdf_url:
-#             resume_text = self.extract_text_from_pdf(resume_input)
-#         else:
-#             resume_text = resume_input
-        
-#         experiences = []
-        
-#         # Pattern to match job experiences
-#         # Looks for company names, titles, dates, and bullet points
-#         experience_pattern = r'([A-Z][A-Za-z\s&.,]+)\s*\|\s*([^|]+?)\s*(?:\([^)]+\))?\s*([A-Za-z]+\s+\d{4}\s*[-–]\s*(?:[A-Za-z]+\s+\d{4}|Present|Current))'
-        
-#         # Find all matches
-#         matches = re.finditer(experience_pattern, resume_text, re.MULTILINE | re.IGNORECASE)
-        
-#         for match in matches:
-#             company = match.group(1).strip()
-#             title = match.group(2).strip()
-#             dates = match.group(3).strip()
-            
-#             # Extract bullet points that follow this experience
-#             # Look for lines that start with common bullet point indicators
-#             bullet_pattern = r'^[\s]*[•·▪▫‣⁃◦‣⁌⁍⁎⁏⁐⁑⁒⁓⁔⁕⁖⁗⁘⁙⁚⁛⁜⁝⁞\-\*]\s*(.+)$'
-            
-#             # Find the position of this experience in the text
-#             start_pos = match.end()
-            
-#             # Look for bullet points in the next few lines
-#             lines = resume_text[start_pos:start_pos + 1000].split('\n')
-#             bullets = []
-            
-#             for line in lines:
-#                 bullet_match = re.match(bullet_pattern, line, re.MULTILINE)
-#                 if bullet_match:
-#                     bullets.append(bullet_match.group(1).strip())
-#                 elif line.strip() and not re.match(r'^[A-Z][A-Za-z\s&.,]+\s*\|\s*', line):
-#                     # If we hit another experience section, stop
-#                     break
-            
-#             if bullets:  # Only add if we found bullet points
-#                 experiences.append({
-#                     'company': company,
-#                     'title': title,
-#                     'dates': dates,
-#                     'bullets': bullets
-#                 })
-        
-#         return experiences
-    
-#     def generate_questions_for_experience(self, experience: Dict[str, Any]) -> List[str]:
-#         """
-#         Generate 3 hyper-specific questions for a given experience using OpenAI
-#         """
-#         prompt = f"""
-#         Based on this work experience, generate 3 hyper-specific, detailed questions that would help understand the candidate's technical depth and problem-solving approach. 
-
-#         Experience:
-#         Company: {experience['company']}
-#         Title: {experience['title']}
-#         Dates: {experience['dates']}
-#         Responsibilities:
-#         {chr(10).join([f"• {bullet}" for bullet in experience['bullets']])}
-
-#         Generate 3 questions that:
-#         1. Are highly specific to the technologies, company, challenges, or achievements mentioned
-#         2. Ask for concrete examples and specific instances
-#         3. Probe into technical decision-making and problem-solving processes
-#         4. Are the type of questions a that make a candidate feel excited to answer, as it speaks to their personal experience
-#         Format each question as a separate line starting with "Q: "
-#         """
-        
-#         try:
-#             response = self.client.chat.completions.create(
-#                 model="gpt-4",
-#                 messages=[
-#                     {"role": "system", "content": "You are a senior technical interviewer who asks insightful, specific questions about technical experiences."},
-#                     {"role": "user", "content": prompt}
-#                 ],
-#                 max_tokens=500,
-#                 temperature=0.7
-#             )
-            
-#             questions_text = response.choices[0].message.content.strip()
-            
-#             # Parse the questions from the response
-#             questions = []
-#             for line in questions_text.split('\n'):
-#                 line = line.strip()
-#                 if line.startswith('Q: '):
-#                     questions.append(line[3:].strip())
-#                 elif line and not line.startswith('Q: ') and len(questions) < 3:
-#                     # If it's a question without the Q: prefix, add it
-#                     questions.append(line.strip())
-            
-#             # Ensure we have exactly 3 questions
-#             while len(questions) < 3:
-#                 questions.append("Can you walk me through a specific technical challenge you faced in this role?")
-            
-#             return questions[:3]
-            
-#         except Exception as e:
-#             print(f"Error generating questions: {str(e)}")
-#             # Fallback questions
-#             return [
-#                 f"What was the most challenging technical problem you solved at {experience['company']}?",
-#                 f"Can you describe a specific instance where you had to debug a production issue?",
-#                 f"What technical decisions did you make that had the biggest impact on your team's success?"
-#             ]
-    
-#     def parse_resume_and_generate_questions(self, resume_input: str, is_pdf_url: bool = False) -> Dict[str, Any]:
-#         """
-#         Main function to parse resume and generate questions for each experience
-        
-#         Args:
-#             resume_input: Either resume text or PDF URL
-#             is_pdf_url: Boolean indicating if the input is a PDF URL
-#         """
-#         try:
-#             # Extract experiences
-#             experiences = self.extract_experiences(resume_input, is_pdf_url)
-            
-#             if not experiences:
-#                 # If regex extraction fails, try a more general approach
-#                 # For fallback, we need to get the text first if it's a PDF URL
-#                 try:
-#                     if is_pdf_url:
-#                         resume_text = self.extract_text_from_pdf(resume_input)
-#                     else:
-#                         resume_text = resume_input
-#                     experiences = self.fallback_extract_experiences(resume_text)
-#                 except Exception as fallback_error:
-#                     print(f"Fallback extraction failed: {str(fallback_error)}")
-#                     experiences = []
-            
-#             # Generate questions for each experience
-#             result = {
-#                 'experiences': [],
-#                 'total_experiences': len(experiences)
-#             }
-            
-#             for experience in experiences:
-#                 questions = self.generate_questions_for_experience(experience)
-                
-#                 result['experiences'].append({
-#                     'company': experience['company'],
-#                     'title': experience['title'],
-#                     'dates': experience['dates'],
-#                     'bullets': experience['bullets'],
-#                     'questions': questions
-#                 })
-            
-#             return result
-            
-#         except Exception as e:
-#             print(f"Error parsing resume: {str(e)}")
-#             return {
-#                 'experiences': [],
-#                 'total_experiences': 0,
-#                 'error': str(e)
-#             }
-    
-#     def fallback_extract_experiences(self, resume_text: str) -> List[Dict[str, Any]]:
-#         """
-#         Fallback method using OpenAI to extract experiences if regex fails
-#         """
-#         prompt = f"""
-#         Extract work experiences from this resume text. For each experience, provide:
-#         1. Company name
-#         2. Job title
-#         3. Dates
-#         4. Key responsibilities/achievements (as bullet points)
-
-#         Resume text:
-#         {resume_text}
-
-#         Return the result as a JSON array with this structure:
-#         [
-#             {{
-#                 "company": "Company Name",
-#                 "title": "Job Title",
-#                 "dates": "Date Range",
-#                 "bullets": ["bullet point 1", "bullet point 2", ...]
-#             }}
-#         ]
-#         """
-        
-#         try:
-#             response = self.client.chat.completions.create(
-#                 model="gpt-4",
-#                 messages=[
-#                     {"role": "system", "content": "You are a resume parser. Extract work experiences and return them as JSON."},
-#                     {"role": "user", "content": prompt}
-#                 ],
-#                 max_tokens=1000,
-#                 temperature=0.3
-#             )
-            
-#             result_text = response.choices[0].message.content.strip()
-            
-#             # Try to parse JSON from the response
-#             # Sometimes the response might have markdown formatting
-#             if result_text.startswith('```json'):
-#                 result_text = result_text[7:-3]  # Remove ```json and ```
-#             elif result_text.startswith('```'):
-#                 result_text = result_text[3:-3]  # Remove ``` markers
-            
-#             experiences = json.loads(result_text)
-#             return experiences
-            
-#         except Exception as e:
-#             print(f"Error in fallback extraction: {str(e)}")
-#             return [] 
\ No newline at end of file
+"""Local work-experience extraction from resume text, with per-experience questions."""
+import asyncio
+import json
+import re
+from typing import Any, Optional
+
+from core.config import settings
+from .llm_gateway import chat_text
+
+_MONTH = r"(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?"
+_DATE = rf"(?:{_MONTH}\s+\d{{4}}|\d{{1,2}}/\d{{4}}|\d{{4}})"
+
+# Compiled once at import; every resume reuses them
+DATE_RANGE = re.compile(
+    rf"\(?\b({_DATE})\s*(?:-|–|—|to)\s*({_DATE}|present|current|now)\b\)?",
+    re.IGNORECASE
+)
+BULLET = re.compile(r"^\s*[•·▪▫‣⁃◦\-\*–]\s*(.+)$")
+# "Company | Title", the format the original parser expected
+PIPE_SEPARATOR = re.compile(r"\s*\|\s*")
+# "Title at Company" / "Title @ Company"
+AT_SEPARATOR = re.compile(r"\s+(?:at|@)\s+", re.IGNORECASE)
+# "Company, Title" / "Title - Company"
+LOOSE_SEPARATOR = re.compile(r"\s*(?:,|\s[-–—]\s)\s*")
+LOCATION = re.compile(r"\s*\([^)]*\)\s*")
+SECTION_HEADING = re.compile(
+    r"^\s*(education|skills|technical skills|certifications?|awards|publications|"
+    r"interests|references|languages|volunteering)\s*:?\s*$",
+    re.IGNORECASE
+)
+EXPERIENCE_HEADING = re.compile(
+    r"^\s*((work|professional|relevant)\s+)?(experience|employment|work history)\s*:?\s*$",
+    re.IGNORECASE
+)
+
+MAX_BULLETS = 12
+QUESTIONS_PER_EXPERIENCE = 3
+
+# Loaded once per process on first use; False when the model isn't installed
+_nlp = None
+
+
+def _load_nlp():
+    global _nlp
+    if _nlp is None:
+        try:
+            import spacy
+            # Only the entity recognizer is needed to tell company names apart from titles
+            _nlp = spacy.load(
+                settings.resume_spacy_model,
+                disable=["parser", "lemmatizer", "attribute_ruler", "tagger"]
+            )
+        except (ImportError, OSError) as e:
+            print(f"spaCy model {settings.resume_spacy_model} unavailable, using patterns only: {str(e)}")
+            _nlp = False
+    return _nlp or None
+
+
+def _split_header(header: str) -> Optional[tuple]:
+    """
+    Split an experience header into (company, title) by its separators.
+
+    Returns None when only the named entities can tell the two apart.
+    """
+    parts = [p for p in PIPE_SEPARATOR.split(header) if p]
+    if len(parts) >= 2:
+        return parts[0], parts[1]
+    parts = AT_SEPARATOR.split(header, maxsplit=1)
+    if len(parts) == 2:
+        # "Title at Company, City": drop the location
+        return parts[1].split(",")[0], parts[0]
+    return None
+
+
+def _header_candidates(lines: list, index: int, date_match: re.Match) -> str:
+    """The text naming the role: the dated line itself, or the line above a date-only line."""
+    header = (lines[index][:date_match.start()] + lines[index][date_match.end():]).strip(" \t|,–—-")
+    if header or index == 0:
+        return header
+    previous = lines[index - 1].strip()
+    if previous and not BULLET.match(previous) and not DATE_RANGE.search(previous):
+        return previous
+    return ""
+
+
+def _scan(text: str) -> list:
+    """Find dated experience headers and the bullets under them."""
+    lines = text.splitlines()
+    experiences = []
+    current = None
+    # Dated entries under Education, Skills etc. aren't jobs
+    skipping = False
+    for index, line in enumerate(lines):
+        if SECTION_HEADING.match(line):
+            current, skipping = None, True
+            continue
+        if EXPERIENCE_HEADING.match(line):
+            current, skipping = None, False
+            continue
+        if skipping:
+            continue
+        date_match = DATE_RANGE.search(line)
+        bullet = BULLET.match(line)
+        if date_match and not bullet:
+            header = LOCATION.sub(" ", _header_candidates(lines, index, date_match)).strip()
+            if current is not None and current["header"] == header and not current["bullets"]:
+                continue
+            current = {
+                "header": header,
+                "dates": f"{date_match.group(1)} - {date_match.group(2)}",
+                "bullets": [],
+            }
+            experiences.append(current)
+        elif current is not None and bullet:
+            if len(current["bullets"]) < MAX_BULLETS:
+                current["bullets"].append(bullet.group(1).strip())
+        elif current is not None and current["bullets"] and line.strip()[:1].islower():
+            # Wrapped continuation of the previous bullet
+            current["bullets"][-1] += " " + line.strip()
+    return [e for e in experiences if e["header"] and e["bullets"]]
+
+
+def extract_experiences_batch(texts: list) -> list:
+    """
+    Extract work experiences from many resume texts.
+
+    Headers are found with the precompiled patterns. Headers whose
+    separators don't say which part is the company go through spaCy's
+    entity recognizer, all resumes together in one nlp.pipe run.
+
+    Args:
+        texts: Resume texts
+
+    Returns:
+        One list per resume of {"company", "title", "dates", "bullets"} dicts
+    """
+    scanned = [_scan(text) for text in texts]
+    ambiguous = []
+    for experiences in scanned:
+        for experience in experiences:
+            split = _split_header(experience["header"])
+            if split:
+                experience["company"], experience["title"] = split
+            else:
+                ambiguous.append(experience)
+
+    nlp = _load_nlp() if ambiguous else None
+    docs = nlp.pipe([e["header"] for e in ambiguous], batch_size=256) if nlp else [None] * len(ambiguous)
+    for experience, doc in zip(ambiguous, docs):
+        orgs = [ent.text for ent in doc.ents if ent.label_ == "ORG"] if doc is not None else []
+        parts = [p for p in LOOSE_SEPARATOR.split(experience["header"]) if p]
+        if orgs:
+            company = orgs[0]
+            rest = [p for p in parts if company not in p]
+            title = rest[0] if rest else experience["header"].replace(company, "").strip(" ,–—-")
+        elif len(parts) >= 2:
+            company, title = parts[0], parts[1]
+        else:
+            company, title = "", parts[0] if parts else experience["header"]
+        experience["company"], experience["title"] = company, title
+
+    return [
+        [
+            {"company": e["company"].strip(), "title": e["title"].strip(), "dates": e["dates"], "bullets": e["bullets"]}
+            for e in experiences
+        ]
+        for experiences in scanned
+    ]
+
+
+def extract_experiences(resume_text: str) -> list:
+    """Extract work experiences from one resume's text; see extract_experiences_batch."""
+    return extract_experiences_batch([resume_text])[0]
+
+
+def _strip_code_fence(text: str) -> str:
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:]
+    elif text.startswith("```"):
+        text = text[3:]
+    if text.endswith("```"):
+        text = text[:-3]
+    return text.strip()
+
+
+async def fallback_extract_experiences(resume_text: str) -> list:
+    """Ask the LLM for the experiences of a resume the local patterns couldn't parse."""
+    prompt = f"""
+    Extract work experiences from this resume text. For each experience, provide:
+    1. Company name
+    2. Job title
+    3. Dates
+    4. Key responsibilities/achievements (as bullet points)
+
+    Resume text:
+    {resume_text}
+
+    Return the result as a JSON array with this structure:
+    [
+        {{
+            "company": "Company Name",
+            "title": "Job Title",
+            "dates": "Date Range",
+            "bullets": ["bullet point 1", "bullet point 2", ...]
+        }}
+    ]
+    """
+    try:
+        raw_content = await chat_text(
+            [
+                {"role": "system", "content": "You are a resume parser. Extract work experiences and return them as JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            route="resume_parser",
+            max_tokens=1000,
+            temperature=0.3
+        )
+        experiences = json.loads(_strip_code_fence(raw_content))
+        return [e for e in experiences if isinstance(e, dict) and e.get("bullets")]
+    except Exception as e:
+        print(f"Error in fallback extraction: {str(e)}")
+        return []
+
+
+def _fallback_questions(experience: dict) -> list:
+    return [
+        f"What was the most challenging technical problem you solved at {experience['company'] or 'this role'}?",
+        "Can you describe a specific instance where you had to debug a production issue?",
+        "What technical decisions did you make that had the biggest impact on your team's success?"
+    ]
+
+
+async def generate_questions_for_experience(experience: dict) -> list:
+    """Generate hyper-specific interview questions about one work experience."""
+    prompt = f"""
+    Based on this work experience, generate {QUESTIONS_PER_EXPERIENCE} hyper-specific, detailed questions that would help understand the candidate's technical depth and problem-solving approach.
+
+    Experience:
+    Company: {experience['company']}
+    Title: {experience['title']}
+    Dates: {experience['dates']}
+    Responsibilities:
+    {chr(10).join(f"• {bullet}" for bullet in experience['bullets'])}
+
+    Generate {QUESTIONS_PER_EXPERIENCE} questions that:
+    1. Are highly specific to the technologies, company, challenges, or achievements mentioned
+    2. Ask for concrete examples and specific instances
+    3. Probe into technical decision-making and problem-solving processes
+    4. Are the type of questions that make a candidate feel excited to answer, as it speaks to their personal experience
+    Format each question as a separate line starting with "Q: "
+    """
+    try:
+        raw_content = await chat_text(
+            [
+                {"role": "system", "content": "You are a senior technical interviewer who asks insightful, specific questions about technical experiences."},
+                {"role": "user", "content": prompt}
+            ],
+            route="resume_parser",
+            max_tokens=500,
+            temperature=0.7
+        )
+    except Exception as e:
+        print(f"Error generating questions: {str(e)}")
+        return _fallback_questions(experience)
+
+    questions = []
+    for line in raw_content.split("\n"):
+        line = line.strip()
+        if line.startswith("Q: "):
+            questions.append(line[3:].strip())
+        elif line and len(questions) < QUESTIONS_PER_EXPERIENCE:
+            questions.append(line)
+    questions += _fallback_questions(experience)[len(questions):]
+    return questions[:QUESTIONS_PER_EXPERIENCE]
+
+
+async def parse_resume_and_generate_questions(resume_text: str) -> dict[str, Any]:
+    """
+    Extract a resume's work experiences and generate questions for each.
+
+    Experiences come from the local extractor; the LLM is only asked to
+    extract them when that finds none. Questions for all experiences are
+    generated concurrently.
+
+    Args:
+        resume_text: The text content of the resume
+
+    Returns:
+        Dict with "experiences" (each with its "questions") and "total_experiences"
+    """
+    try:
+        experiences = await asyncio.to_thread(extract_experiences, resume_text)
+        if not experiences:
+            experiences = await fallback_extract_experiences(resume_text)
+
+        questions = await asyncio.gather(*(generate_questions_for_experience(e) for e in experiences))
+        return {
+            "experiences": [
+                {
+                    "company": experience.get("company", ""),
+                    "title": experience.get("title", ""),
+                    "dates": experience.get("dates", ""),
+                    "bullets": experience.get("bullets", []),
+                    "questions": experience_questions,
+                }
+                for experience, experience_questions in zip(experiences, questions)
+            ],
+            "total_experiences": len(experiences),
+        }
+    except Exception as e:
+        print(f"Error parsing resume: {str(e)}")
+        return {"experiences": [], "total_experiences": 0, "error": str(e)}
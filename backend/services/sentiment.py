@@ -1,17 +1,23 @@
 """Sentiment analysis and communication evaluation service."""
 import json
 import re
-from openai import OpenAI
-import os
-from dotenv import load_dotenv
+from typing import Optional
 
-load_dotenv()
+from .llm_gateway import chat_text
 
-OPEN_AI_API_KEY = os.getenv("OPEN_AI_API_KEY")
-client = OpenAI(api_key=OPEN_AI_API_KEY)
+RECRUITER_CARD_PROMPT = (
+    "You are a hiring screener. Read the interview transcript and produce a 5-line recruiter card "
+    "that is decision-ready and easy to skim in under 10 seconds. "
+    "Follow these rules exactly: "
+    "Line 1 — Decision: one of {Strong Yes, Yes, Leaning Yes, Neutral, Leaning No, No, Strong No} + 6–10 word rationale. "
+    "Line 2 — Evidence (3 bullets): each ≤ 12 words; cite up to 6-word quotes from the transcript in quotes; no generic adjectives. "
+    "Line 3 — Risks (≤2): label + 6–10 word evidence from transcript. "
+    "Line 4 — Scores: Customer Empathy / Communication / Conflict Resolution / Assertiveness (1–5) with 3–5 word reasons. "
+    "Line 5 — Follow-ups (1–2): targeted, behavior-anchored questions (\"What would you say next?\")."
+)
 
 
-def summarize_text(text: str) -> str:
+async def summarize_text(text: str) -> str:
     """
     Summarize interview transcript into a decision-ready recruiter card.
     
@@ -21,32 +27,19 @@ def summarize_text(text: str) -> str:
     Returns:
         A 5-line summary suitable for quick recruiter review
     """
-    system_prompt = (
-        "You are a hiring screener. Read the interview transcript and produce a 5-line recruiter card "
-        "that is decision-ready and easy to skim in under 10 seconds. "
-        "Follow these rules exactly: "
-        "Line 1 — Decision: one of {Strong Yes, Yes, Leaning Yes, Neutral, Leaning No, No, Strong No} + 6–10 word rationale. "
-        "Line 2 — Evidence (3 bullets): each ≤ 12 words; cite up to 6-word quotes from the transcript in quotes; no generic adjectives. "
-        "Line 3 — Risks (≤2): label + 6–10 word evidence from transcript. "
-        "Line 4 — Scores: Customer Empathy / Communication / Conflict Resolution / Assertiveness (1–5) with 3–5 word reasons. "
-        "Line 5 — Follow-ups (1–2): targeted, behavior-anchored questions (\"What would you say next?\")."
-    )
-    
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
+    summary = await chat_text(
+        [
+            {"role": "system", "content": RECRUITER_CARD_PROMPT},
             {"role": "user", "content": f"Here is the transcript to analyze:\n\n{text}"}
         ],
+        route="summary",
         max_tokens=300
     )
-    
-    summary = response.choices[0].message.content
     print("Summary:", summary)
     return summary
 
 
-def analyze_communication(transcript: str) -> dict:
+async def analyze_communication(transcript: str) -> dict:
     """
     Analyze communication skills from an interview transcript.
     
@@ -66,19 +59,18 @@ def analyze_communication(transcript: str) -> dict:
         f"Transcript: {transcript}"
     )
     
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    content = await chat_text(
+        [
             {"role": "system", "content": "You are a communication skills analyst."},
             {"role": "user", "content": prompt}
         ],
+        route="communication",
         max_tokens=200
     )
     
-    print("Communication Analysis:", response.choices[0].message.content)
+    print("Communication Analysis:", content)
     
     # Clean the response content to handle markdown formatting
-    content = response.choices[0].message.content.strip()
     
     # Remove markdown code block markers if present
     if content.startswith('```json'):
@@ -100,7 +92,7 @@ def analyze_communication(transcript: str) -> dict:
         }
 
 
-def generate_behavioral_insights(transcript: str, job_description: str) -> dict:
+async def generate_behavioral_insights(transcript: str, job_description: str) -> dict:
     """
     Generate behavioral insights based on transcript and job description.
     
@@ -122,20 +114,19 @@ def generate_behavioral_insights(transcript: str, job_description: str) -> dict:
         '{"insights": ["🎤 Presented at a major conference", "🎸 Plays in a band on weekends"]}'
     )
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    content = await chat_text(
+        [
             {"role": "system", "content": "You are a creative talent scout."},
             {"role": "user", "content": prompt}
         ],
+        route="insights",
         max_tokens=200,
         temperature=0.8
     )
     
-    print("Behavioral Insights:", response.choices[0].message.content)
+    print("Behavioral Insights:", content)
     
     # Clean the response content to handle markdown formatting
-    content = response.choices[0].message.content.strip()
     
     # Remove markdown code block markers if present
     if content.startswith('```json'):
@@ -168,3 +159,132 @@ def generate_behavioral_insights(transcript: str, job_description: str) -> dict:
                 insights.append(line)
         
         return {"insights": insights[:4]}  # Return max 4 insights
+
+
+ANALYSIS_BUNDLE_SCHEMA = {
+    "name": "analysis_bundle",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "summary": {"type": "string"},
+            "communication_analysis": {
+                "type": "object",
+                "properties": {
+                    "strengths": {"type": "array", "items": {"type": "string"}},
+                    "improvements": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["strengths", "improvements"],
+                "additionalProperties": False,
+            },
+            "behavioral_insights": {
+                "type": "object",
+                "properties": {
+                    "insights": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["insights"],
+                "additionalProperties": False,
+            },
+        },
+        "required": ["summary", "communication_analysis", "behavioral_insights"],
+        "additionalProperties": False,
+    },
+}
+
+
+def _is_string_list(value) -> bool:
+    return isinstance(value, list) and len(value) > 0 and all(
+        isinstance(item, str) and item.strip() for item in value
+    )
+
+
+def validate_analysis_bundle(data: dict, with_insights: bool) -> dict:
+    """
+    Keep only the bundle fields that match the VideoAnalysisResult shape.
+    
+    Args:
+        data: Parsed JSON returned by the bundle call
+        with_insights: Whether behavioral insights were requested
+        
+    Returns:
+        Dict containing the subset of 'summary', 'communication_analysis'
+        and 'behavioral_insights' that passed validation
+    """
+    valid = {}
+    if not isinstance(data, dict):
+        return valid
+
+    summary = data.get("summary")
+    if isinstance(summary, str) and summary.strip():
+        valid["summary"] = summary.strip()
+
+    communication = data.get("communication_analysis")
+    if isinstance(communication, dict) \
+            and _is_string_list(communication.get("strengths")) \
+            and _is_string_list(communication.get("improvements")):
+        valid["communication_analysis"] = {
+            "strengths": communication["strengths"],
+            "improvements": communication["improvements"],
+        }
+
+    insights = data.get("behavioral_insights")
+    if with_insights and isinstance(insights, dict) and _is_string_list(insights.get("insights")):
+        valid["behavioral_insights"] = {"insights": insights["insights"][:4]}
+
+    return valid
+
+
+async def analyze_transcript_bundle(transcript: str, job_description: Optional[str] = None) -> dict:
+    """
+    Produce the recruiter card, communication analysis and behavioral insights
+    from a single JSON-schema-constrained call.
+    
+    Args:
+        transcript: The interview transcript text
+        job_description: Optional job description for behavioral insights
+        
+    Returns:
+        Dict with the validated subset of 'summary', 'communication_analysis'
+        and 'behavioral_insights'; missing fields should be filled by the
+        individual analysis calls
+    """
+    if job_description:
+        insights_rule = (
+            "behavioral_insights.insights: 2-4 distinctive attributes of the candidate that relate closely "
+            "to the job description, as short, punchy insights preceded by a relevant emoji. "
+            "Avoid clichés or generic statements."
+        )
+    else:
+        insights_rule = "behavioral_insights.insights: return an empty array."
+
+    prompt = (
+        "Analyze the following interview transcript and fill every field of the response.\n"
+        f"summary: {RECRUITER_CARD_PROMPT}\n"
+        "communication_analysis.strengths: 2 key strengths in the interviewee's communication style, "
+        "each in 9 words or fewer.\n"
+        "communication_analysis.improvements: 2 areas for improvement in the interviewee's communication style, "
+        "each in 9 words or fewer.\n"
+        f"{insights_rule}\n\n"
+        f"Transcript:\n{transcript}"
+    )
+    if job_description:
+        prompt += f"\n\nJob description:\n{job_description}"
+
+    content = await chat_text(
+        [
+            {"role": "system", "content": "You are a hiring screener and communication skills analyst."},
+            {"role": "user", "content": prompt}
+        ],
+        route="bundle",
+        max_tokens=700,
+        response_format={"type": "json_schema", "json_schema": ANALYSIS_BUNDLE_SCHEMA}
+    )
+
+    print("Analysis Bundle:", content)
+
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        print("Error parsing JSON in analysis bundle:", content)
+        return {}
+    return validate_analysis_bundle(data, with_insights=bool(job_description))
@@ -0,0 +1,80 @@
+"""Transcript cache keyed by stable video identity."""
+import hashlib
+from typing import Optional
+from urllib.parse import urlsplit
+import requests
+
+from core.cache import make_cache
+from core.config import settings
+
+transcript_cache = make_cache(
+    settings.transcript_cache_backend,
+    path=settings.transcript_cache_path,
+    default_ttl=settings.transcript_cache_ttl_seconds,
+    max_bytes=settings.transcript_cache_max_mb * 1024 * 1024,
+)
+
+
+def video_identity(video_url: str) -> Optional[str]:
+    """
+    Derive a cache key that identifies the video's content, not its URL.
+    
+    Signed URLs change on every request, so the key is built from the object
+    path (without the query string) plus the storage ETag, falling back to
+    Content-Length and Last-Modified when no ETag is served.
+    
+    Args:
+        video_url: URL of the video
+        
+    Returns:
+        Hex SHA-256 key, or None if the storage headers can't identify the video
+    """
+    try:
+        resp = requests.head(video_url, allow_redirects=True, timeout=5)
+    except requests.RequestException as e:
+        print(f"Could not identify video for transcript cache: {e}")
+        return None
+    if resp.status_code != 200:
+        return None
+
+    etag = resp.headers.get("etag", "").removeprefix("W/").strip('"')
+    length = resp.headers.get("content-length", "")
+    if etag:
+        version = f"etag:{etag}:{length}"
+    elif length and resp.headers.get("last-modified"):
+        version = f"modified:{resp.headers['last-modified']}:{length}"
+    else:
+        return None
+
+    path = urlsplit(video_url).path
+    return hashlib.sha256(f"{path}|{version}".encode()).hexdigest()
+
+
+def get_cached_transcript(key: Optional[str]) -> Optional[str]:
+    """Return the cached transcript text for a video identity, if any."""
+    if transcript_cache is None or not key:
+        return None
+    entry = transcript_cache.get(f"transcript:{key}")
+    return entry["text"] if entry else None
+
+
+def cache_transcript(key: Optional[str], text: str) -> None:
+    """Store transcript text for a video identity."""
+    if transcript_cache is None or not key or not text:
+        return
+    transcript_cache.set(f"transcript:{key}", {"text": text})
+
+
+def get_cached_local_analysis(key: Optional[str]) -> dict:
+    """Return the cached results of the local analyzers (e.g. "prosody", "emotions") for a video."""
+    if transcript_cache is None or not key:
+        return {}
+    return transcript_cache.get(f"local:{key}") or {}
+
+
+def cache_local_analysis(key: Optional[str], results: dict) -> None:
+    """Store the non-empty local analyzer results for a video next to its transcript."""
+    results = {name: value for name, value in results.items() if value}
+    if transcript_cache is None or not key or not results:
+        return
+    transcript_cache.set(f"local:{key}", {**get_cached_local_analysis(key), **results})
@@ -0,0 +1,165 @@
+"""Non-blocking AssemblyAI transcription with webhook and polling completion."""
+import asyncio
+import time
+from typing import Optional
+import httpx
+
+from core.config import settings
+from core.metrics import metrics
+
+WEBHOOK_AUTH_HEADER = "X-Webhook-Secret"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class TranscriptionError(Exception):
+    """Raised when AssemblyAI reports a failed or timed-out transcription."""
+
+
+class AsyncTranscriber:
+    """
+    Submit transcriptions to the AssemblyAI REST API without blocking.
+
+    After submission the caller's coroutine is suspended until either the
+    webhook endpoint reports completion via notify() or a poll finds the
+    transcript finished. Polling is the fallback: it runs at a slow interval
+    when a webhook is configured, and with backoff when it isn't. A webhook
+    that lands on a different worker process is simply picked up by polling.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        webhook_url: str = "",
+        webhook_secret: str = "",
+    ):
+        self.webhook_url = webhook_url
+        self.webhook_secret = webhook_secret
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            headers={"authorization": api_key},
+            timeout=30,
+        )
+        self._waiters: dict[str, asyncio.Event] = {}
+
+    async def submit(self, audio_url: str) -> str:
+        """Submit audio for transcription and return the transcript id."""
+        body = {"audio_url": audio_url}
+        if self.webhook_url:
+            body["webhook_url"] = self.webhook_url
+            if self.webhook_secret:
+                body["webhook_auth_header_name"] = WEBHOOK_AUTH_HEADER
+                body["webhook_auth_header_value"] = self.webhook_secret
+        resp = await self._client.post("/v2/transcript", json=body)
+        resp.raise_for_status()
+        return resp.json()["id"]
+
+    async def upload(self, path: str) -> str:
+        """Stream a local media file to AssemblyAI and return its upload URL."""
+        async def chunks():
+            with open(path, "rb") as f:
+                while chunk := await asyncio.to_thread(f.read, UPLOAD_CHUNK_SIZE):
+                    yield chunk
+
+        start = time.perf_counter()
+        resp = await self._client.post("/v2/upload", content=chunks())
+        resp.raise_for_status()
+        metrics.observe("transcription.upload_latency", time.perf_counter() - start)
+        return resp.json()["upload_url"]
+
+    async def fetch(self, transcript_id: str) -> dict:
+        """Return the current transcript resource."""
+        resp = await self._client.get(f"/v2/transcript/{transcript_id}")
+        resp.raise_for_status()
+        return resp.json()
+
+    def notify(self, transcript_id: str) -> bool:
+        """
+        Wake the coroutine waiting on a transcript; called by the webhook endpoint.
+
+        Returns:
+            True if this process was waiting on the transcript
+        """
+        event = self._waiters.get(transcript_id)
+        if event is None:
+            return False
+        event.set()
+        return True
+
+    async def wait(self, transcript_id: str) -> dict:
+        """Suspend until the transcript completes and return it."""
+        event = self._waiters.setdefault(transcript_id, asyncio.Event())
+        interval = settings.transcription_poll_interval_seconds
+        deadline = time.monotonic() + settings.transcription_timeout_seconds
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=interval)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+
+                transcript = await self.fetch(transcript_id)
+                if transcript["status"] == "completed":
+                    return transcript
+                if transcript["status"] == "error":
+                    raise TranscriptionError(transcript.get("error") or "Transcription failed")
+                if time.monotonic() > deadline:
+                    raise TranscriptionError(f"Transcription {transcript_id} timed out")
+
+                if self.webhook_url:
+                    interval = settings.transcription_webhook_poll_interval_seconds
+                else:
+                    interval = min(interval * 2, settings.transcription_poll_max_interval_seconds)
+        finally:
+            self._waiters.pop(transcript_id, None)
+
+    async def transcribe_detailed(self, audio_url: str) -> dict:
+        """
+        Transcribe audio by URL and return the full transcript resource.
+
+        Args:
+            audio_url: Publicly reachable URL of the audio or video
+
+        Returns:
+            The completed transcript, including text and word timings
+        """
+        start = time.perf_counter()
+        transcript_id = await self.submit(audio_url)
+        transcript = await self.wait(transcript_id)
+        metrics.observe("transcription.latency", time.perf_counter() - start)
+        return transcript
+
+    async def transcribe(self, audio_url: str) -> Optional[str]:
+        """
+        Transcribe audio by URL.
+
+        Args:
+            audio_url: Publicly reachable URL of the audio or video
+
+        Returns:
+            Transcript text, or None if the transcript was empty
+        """
+        transcript = await self.transcribe_detailed(audio_url)
+        return transcript.get("text") or None
+
+    async def transcribe_file(self, path: str) -> Optional[str]:
+        """
+        Transcribe a local media file by uploading it first.
+
+        Args:
+            path: Path of the audio or video file
+
+        Returns:
+            Transcript text, or None if the transcript was empty
+        """
+        upload_url = await self.upload(path)
+        return await self.transcribe(upload_url)
+
+
+transcriber = AsyncTranscriber(
+    api_key=settings.assemblyai_api_key,
+    base_url=settings.assemblyai_base_url,
+    webhook_url=settings.assemblyai_webhook_url,
+    webhook_secret=settings.assemblyai_webhook_secret,
+)
@@ -1,14 +1,34 @@
 """Video analysis service using AssemblyAI for transcription."""
+import asyncio
 import os
-from typing import TypedDict, Optional
-import assemblyai as aai
+import shutil
+import tempfile
+import time
+from typing import NotRequired, TypedDict, Optional
+import requests
 
+from core.artifact_store import artifact_store
 from core.config import settings
-from .sentiment import summarize_text, analyze_communication, generate_behavioral_insights
-
-# Initialize AssemblyAI
-aai.settings.api_key = settings.assemblyai_api_key
-transcriber = aai.Transcriber()
+from core.metrics import metrics
+from core.process_pool import audio_pool
+from .audio_analysis import analyze_prosody_from_video, extract_speech_audio
+from .chunked_transcription import transcribe_chunked
+from .emotion_recognition import VideoEmotionAnalyzer
+from .media_ingest import IngestedMedia, ingest_media
+from .sentiment import (
+    summarize_text,
+    analyze_communication,
+    generate_behavioral_insights,
+    analyze_transcript_bundle,
+)
+from .transcript_cache import (
+    video_identity,
+    get_cached_transcript,
+    cache_transcript,
+    get_cached_local_analysis,
+    cache_local_analysis,
+)
+from .transcription import transcriber
 
 
 class VideoAnalysisResult(TypedDict):
@@ -18,77 +38,368 @@ class VideoAnalysisResult(TypedDict):
     communication_analysis: dict
     enthusiasm_timestamps: list
     behavioral_insights: dict
+    prosody: dict
+    emotions: dict
+    # Set only when the analysis failed; the other fields are then placeholders
+    error: NotRequired[str]
+
+
+async def _run_stage(name: str, coro, default, timeout: float):
+    """Await one analysis stage, returning default if it fails or times out."""
+    try:
+        return await asyncio.wait_for(coro, timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"{name} timed out after {timeout}s")
+    except Exception as e:
+        print(f"{name} failed: {str(e)}")
+    return default
+
+
+async def analyze_transcript(
+    transcript_text: str,
+    job_description: Optional[str] = None
+) -> dict:
+    """
+    Run the transcript LLM stages concurrently.
+    
+    Each stage has its own timeout, and a failed stage falls back to an empty
+    result without discarding the others. With ANALYSIS_MODE=bundle a single
+    structured call is tried first, and only the fields it fails to produce
+    are computed by the individual stages.
+    
+    Args:
+        transcript_text: The transcript to analyze
+        job_description: Optional job description for behavioral insights
+        
+    Returns:
+        Dict with 'summary', 'communication_analysis' and 'behavioral_insights'
+    """
+    timeout = settings.analysis_stage_timeout_seconds
+
+    analysis = {
+        "summary": "Summary could not be generated.",
+        "communication_analysis": {},
+        "behavioral_insights": {},
+    }
+    if settings.analysis_mode == "bundle":
+        bundle = await _run_stage(
+            "Analysis bundle", analyze_transcript_bundle(transcript_text, job_description),
+            {}, timeout
+        )
+        analysis.update(bundle)
+    else:
+        bundle = {}
+
+    stages = {}
+    if "summary" not in bundle:
+        stages["summary"] = _run_stage(
+            "Summary", summarize_text(transcript_text),
+            "Summary could not be generated.", timeout
+        )
+    if "communication_analysis" not in bundle:
+        stages["communication_analysis"] = _run_stage(
+            "Communication analysis", analyze_communication(transcript_text),
+            {}, timeout
+        )
+    # Behavioral insights are only generated when a job description is provided
+    if job_description and "behavioral_insights" not in bundle:
+        stages["behavioral_insights"] = _run_stage(
+            "Behavioral insights", generate_behavioral_insights(transcript_text, job_description),
+            {}, timeout
+        )
 
+    results = await asyncio.gather(*stages.values())
+    analysis.update(zip(stages.keys(), results))
+    return analysis
 
-def analyze_video(
+
+def _content_length(video_url: str) -> Optional[int]:
+    try:
+        resp = requests.head(video_url, allow_redirects=True, timeout=5)
+        return int(resp.headers["content-length"])
+    except (requests.RequestException, KeyError, ValueError):
+        return None
+
+
+async def _transcribe_speech(video_url: str, media: Optional[IngestedMedia]) -> tuple:
+    """
+    Transcribe compact Opus audio instead of the video.
+    
+    The Opus file comes from the shared ingestion pass when there is one,
+    otherwise ffmpeg extracts it from the URL into a temp directory.
+    
+    Returns:
+        (transcript text, bytes uploaded)
+    """
+    if media is not None:
+        return await transcriber.transcribe_file(media.speech_path), os.path.getsize(media.speech_path)
+
+    workdir = tempfile.mkdtemp(prefix="speech-", dir=settings.media_ingest_dir or None)
+    try:
+        speech_path = os.path.join(workdir, "speech.ogg")
+        await asyncio.to_thread(
+            extract_speech_audio, video_url, speech_path, bitrate=settings.transcription_opus_bitrate
+        )
+        return await transcriber.transcribe_file(speech_path), os.path.getsize(speech_path)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def transcribe_video(
+    video_url: str,
+    media: Optional[IngestedMedia] = None,
+    video_key: Optional[str] = None
+) -> Optional[str]:
+    """
+    Return the transcript text for a video, using the transcript cache.
+    
+    The cache is keyed by the video's storage identity rather than its signed
+    URL, so retries and re-analysis skip transcription entirely. With
+    TRANSCRIPTION_AUDIO_MODE=opus only compact mono audio is uploaded, and
+    when the decoded audio is at hand it is trimmed and split at pauses into
+    concurrently transcribed segments. The bytes saved and end-to-end latency
+    of each mode are recorded in metrics.
+    
+    Args:
+        video_url: URL of the video to transcribe
+        media: Ingested media of the video, whose audio is uploaded if present
+        video_key: The video's cache identity, if already looked up
+        
+    Returns:
+        Transcript text, or None if transcription failed or was empty
+    """
+    if video_key is None:
+        video_key = await asyncio.to_thread(video_identity, video_url)
+    cached = get_cached_transcript(video_key)
+    if cached:
+        print("Using cached transcript")
+        return cached
+
+    mode = settings.transcription_audio_mode
+    if mode == "opus" and media is not None:
+        if settings.transcription_chunking_enabled and media.audio_path:
+            mode = "chunked"
+        elif not media.speech_path:
+            # Nothing to extract from, let the provider have the video
+            mode = "video"
+    if media is not None:
+        source_bytes = media.bytes_downloaded
+    else:
+        source_bytes = await asyncio.to_thread(_content_length, video_url)
+
+    # Submit and suspend until the webhook or a poll reports completion
+    start = time.perf_counter()
+    if mode == "chunked":
+        transcript, sent_bytes = await transcribe_chunked(media.audio_path)
+        transcript_text = transcript["text"]
+    elif mode == "opus":
+        transcript_text, sent_bytes = await _transcribe_speech(video_url, media)
+    else:
+        transcript_text, sent_bytes = await transcriber.transcribe(video_url), source_bytes
+    metrics.observe(f"transcription.{mode}.e2e_latency", time.perf_counter() - start)
+    if sent_bytes:
+        metrics.increment(f"transcription.{mode}.bytes_sent", sent_bytes)
+    if mode != "video" and source_bytes:
+        metrics.increment(f"transcription.{mode}.bytes_saved", max(source_bytes - sent_bytes, 0))
+
+    if not transcript_text:
+        return None
+
+    cache_transcript(video_key, transcript_text)
+    return transcript_text
+
+
+async def _ingest(video_url: str) -> Optional[IngestedMedia]:
+    """
+    Download and demux the video once for the local analyzers.
+    
+    Returns None when no local analyzer is enabled or ingestion fails; each
+    analyzer then reads the URL itself.
+    """
+    frame_interval = settings.emotion_sample_seconds if settings.emotion_analysis_enabled else None
+    opus = settings.transcription_audio_mode == "opus"
+    # Chunked transcription segments the decoded audio instead of using the Opus output
+    chunking = opus and settings.transcription_chunking_enabled
+    audio = settings.audio_analysis_enabled or chunking
+    if not settings.media_ingestion_enabled or not (audio or frame_interval):
+        return None
+    return await _run_stage(
+        "Media ingestion",
+        ingest_media(video_url, audio=audio, speech=opus and not chunking, frame_interval=frame_interval),
+        None, settings.media_ingest_timeout_seconds
+    )
+
+
+async def _analyze_audio(source: Optional[str]) -> dict:
+    """Run the CPU-bound prosody analysis in the audio process pool."""
+    if not settings.audio_analysis_enabled or not source:
+        return {}
+    return await _run_stage(
+        "Audio analysis", audio_pool.run(analyze_prosody_from_video, source),
+        {}, settings.audio_analysis_timeout_seconds
+    )
+
+
+async def _analyze_emotions(video_url: str, media: Optional[IngestedMedia]) -> dict:
+    """Classify facial emotions on sampled frames, from the ingested frames when available."""
+    if not settings.emotion_analysis_enabled:
+        return {}
+    analyzer = VideoEmotionAnalyzer()
+    if media is not None:
+        work = asyncio.to_thread(analyzer.analyze_frames, media.frame_paths, media.frame_interval)
+    else:
+        work = asyncio.to_thread(analyzer.analyze_video, video_url, settings.emotion_sample_seconds)
+    return await _run_stage("Emotion analysis", work, {}, settings.emotion_analysis_timeout_seconds)
+
+
+def _enabled_local_analyzers() -> list:
+    analyzers = []
+    if settings.audio_analysis_enabled:
+        analyzers.append("prosody")
+    if settings.emotion_analysis_enabled:
+        analyzers.append("emotions")
+    return analyzers
+
+
+def _cached_media_analysis(video_key: Optional[str]) -> Optional[tuple]:
+    """
+    Return (transcript, prosody, emotions) when all of them are cached for the video.
+    
+    On a hit nothing has to be downloaded; only the LLM stages run again.
+    """
+    transcript_text = get_cached_transcript(video_key)
+    if not transcript_text:
+        return None
+    local = get_cached_local_analysis(video_key)
+    if any(name not in local for name in _enabled_local_analyzers()):
+        return None
+    print("Using cached transcript and media analysis")
+    return transcript_text, local.get("prosody", {}), local.get("emotions", {})
+
+
+async def _collect_local_analysis(video_key: Optional[str], audio_task, emotion_task) -> tuple:
+    """Wait for the local analyzers and cache what they produced."""
+    prosody, emotions = await asyncio.gather(audio_task, emotion_task)
+    cache_local_analysis(video_key, {"prosody": prosody, "emotions": emotions})
+    return prosody, emotions
+
+
+async def _run_media_analysis(video_url: str, video_key: Optional[str]) -> tuple:
+    """
+    Download the video once and start transcription and the local analyzers on it.
+    
+    Returns:
+        (transcript text or None, task resolving to (prosody, emotions)); the
+        local analyzers keep running while the caller runs the LLM stages
+    """
+    tasks = []
+    try:
+        media = await _ingest(video_url)
+        try:
+            audio_task = asyncio.create_task(_analyze_audio(media.audio_path if media else video_url))
+            emotion_task = asyncio.create_task(_analyze_emotions(video_url, media))
+            tasks = [audio_task, emotion_task]
+            if media is not None:
+                # Each analyzer keeps the temp data alive until it finishes
+                for task in tasks:
+                    media.attach(task)
+            transcript_text = await transcribe_video(video_url, media, video_key)
+        finally:
+            if media is not None:
+                media.release()
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
+    return transcript_text, asyncio.create_task(_collect_local_analysis(video_key, audio_task, emotion_task))
+
+
+async def analyze_video(
     video_url: str,
     job_description: Optional[str] = None
 ) -> VideoAnalysisResult:
     """
     Analyze video and return comprehensive results.
     
+    The video is downloaded once; compact speech audio is uploaded for
+    transcription while the audio and emotion analyzers work on the same
+    download in process pools. When the transcript and the analyzers'
+    results are already cached for the video, nothing is downloaded and
+    only the LLM stages run.
+    
     Args:
         video_url: URL of the video to analyze
         job_description: Optional job description for behavioral insights
         
     Returns:
-        VideoAnalysisResult with summary, transcript, and analysis
+        VideoAnalysisResult with summary, transcript, and analysis; on failure
+        the summary describes the error and "error" is set
     """
+    local_task = None
     try:
         print(f"Attempting to transcribe video from URL: {video_url}")
         if not video_url or not video_url.startswith('http'):
             raise ValueError("Invalid video URL format")
 
-        # Transcribe the video file
-        transcript = transcriber.transcribe(video_url)
+        # Check the caches before downloading anything
+        video_key = await asyncio.to_thread(video_identity, video_url)
+        cached = _cached_media_analysis(video_key)
+        if cached:
+            transcript_text, prosody, emotions = cached
+        else:
+            transcript_text, local_task = await _run_media_analysis(video_url, video_key)
 
-        # Check if transcript exists and has text
-        if not transcript or not hasattr(transcript, 'text') or not transcript.text:
+        # Check if transcript has text
+        if not transcript_text:
             print("Transcription failed or returned empty result")
+            if local_task is not None:
+                prosody, emotions = await local_task
             return {
                 "summary": "Transcription could not be completed. Only basic analysis is available.",
-                "filename": f"summary_{abs(hash(video_url))}.txt",
+                "filename": "",
                 "transcript": "",
                 "communication_analysis": {},
-                "enthusiasm_timestamps": [],
-                "behavioral_insights": {}
+                "enthusiasm_timestamps": prosody.get("enthusiasm_timestamps", []),
+                "behavioral_insights": {},
+                "prosody": prosody,
+                "emotions": emotions
             }
 
-        print(f"Transcription successful. Length: {len(transcript.text)}")
+        print(f"Transcription successful. Length: {len(transcript_text)}")
 
         # Process transcript
-        transcript_text = transcript.text
-        summary = summarize_text(transcript_text)
-        communication_analysis = analyze_communication(transcript_text)
-        
-        # Generate behavioral insights if job description is provided
-        behavioral_insights = {}
-        if job_description:
-            behavioral_insights = generate_behavioral_insights(transcript_text, job_description)
-
-        # Save summary to file
-        os.makedirs("txt_files", exist_ok=True)
-        filename = f"summary_{abs(hash(video_url))}.txt"
-        with open(os.path.join("txt_files", filename), "w") as file:
-            file.write(summary)
-        
+        analysis = await analyze_transcript(transcript_text, job_description)
+        summary = analysis["summary"]
+        if local_task is not None:
+            prosody, emotions = await local_task
+
+        # Keep summary and transcript in the artifact store; filename is the summary's content key
+        filename = artifact_store.put("summary", summary)
+        artifact_store.put("transcript", transcript_text)
+
         return {
             "summary": summary,
             "filename": filename,
             "transcript": transcript_text,
-            "communication_analysis": communication_analysis,
-            "enthusiasm_timestamps": [],
-            "behavioral_insights": behavioral_insights
+            "communication_analysis": analysis["communication_analysis"],
+            "enthusiasm_timestamps": prosody.get("enthusiasm_timestamps", []),
+            "behavioral_insights": analysis["behavioral_insights"],
+            "prosody": prosody,
+            "emotions": emotions
         }
 
     except Exception as e:
         print(f"Error in video analysis: {str(e)}")
+        if local_task is not None:
+            local_task.cancel()
         return {
             "summary": f"Error analyzing video: {str(e)}",
             "filename": "",
             "transcript": "",
             "communication_analysis": {},
             "enthusiasm_timestamps": [],
-            "behavioral_insights": {}
+            "behavioral_insights": {},
+            "prosody": {},
+            "emotions": {},
+            "error": str(e)
         }
-